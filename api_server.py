@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import tornado.ioloop
+import tornado.web
+
+from database.db import get_user_data, init_db
+from database.search import ensure_search_index, search_restaurants
+from model.coalesce import CoalescingRecommender
+from model.recommender import RANKINGS, FoodRecommender
+from utils.gamification import get_leaderboard, record_visit
+from utils.reloader import POLL_INTERVAL, ReloadingRecommender
+
+# Jobs allowed to wait for a worker before new requests get 503
+MAX_PENDING = 64
+
+RESULT_FIELDS = ("name", "cuisines", "city", "score", "latitude", "longitude", "address")
+
+
+class Backend:
+    """
+    Shared model plus a bounded executor. Scoring and SQLite calls run on
+    the pool so the event loop only parses requests and writes JSON.
+    """
+
+    def __init__(self, recommender, workers=None, max_pending=MAX_PENDING):
+        self.recommender = recommender
+        self.pool = ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2))
+        self.max_pending = max_pending
+        self.pending = 0   # only touched on the event loop thread
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise tornado.web.HTTPError(503, reason="Server busy, retry later")
+        self.pending += 1
+        try:
+            return await tornado.ioloop.IOLoop.current().run_in_executor(self.pool, fn, *args)
+        finally:
+            self.pending -= 1
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def initialize(self, backend):
+        self.backend = backend
+
+    def set_default_headers(self):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    def write_json(self, payload):
+        self.write(json.dumps(payload, ensure_ascii=False))
+
+    def write_error(self, status_code, **kwargs):
+        error = self._reason
+        exc = kwargs.get("exc_info", (None, None, None))[1]
+        if isinstance(exc, tornado.web.MissingArgumentError):
+            error = exc.log_message
+        self.write_json({"error": error})
+
+    def get_number(self, name, cast, default=None, minimum=None):
+        value = self.get_argument(name, None)
+        if value in (None, ""):
+            return default
+        try:
+            value = cast(value)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason=f"'{name}' must be a number")
+        if minimum is not None and value < minimum:
+            raise tornado.web.HTTPError(400, reason=f"'{name}' must be at least {minimum}")
+        return value
+
+    def write_results(self, results):
+        self.write_json({"results": [dict(zip(RESULT_FIELDS, r)) for r in results]})
+
+
+class HealthHandler(BaseHandler):
+    def get(self):
+        self.write_json({
+            "status": "ok",
+            "pending": self.backend.pending,
+            "model": self.backend.recommender.status(),
+        })
+
+
+class RecommendHandler(BaseHandler):
+    async def get(self):
+        restaurant = self.get_argument("restaurant")
+        city = self.get_argument("city")
+        top_n = self.get_number("top_n", int, 10, minimum=1)
+        diversity = self.get_number("diversity", float, 0.0)
+        if not 0 <= diversity < 1:
+            raise tornado.web.HTTPError(400, reason="'diversity' must be in [0, 1)")
+        results = await self.backend.run(self.backend.recommender.recommend, restaurant, city, top_n, diversity)
+        self.write_results(results)
+
+
+class PreferencesHandler(BaseHandler):
+    async def get(self):
+        cuisine = self.get_argument("cuisine", "")
+        city = self.get_argument("city", "")
+        price = self.get_number("price", int)
+        rating = self.get_number("rating", float)
+        min_cost = self.get_number("min_cost", float)
+        max_cost = self.get_number("max_cost", float)
+        rank_by = self.get_argument("rank_by", "similarity")
+        if rank_by not in RANKINGS:
+            raise tornado.web.HTTPError(400, reason=f"'rank_by' must be one of {', '.join(RANKINGS)}")
+        top_n = self.get_number("top_n", int, 10, minimum=1)
+        results, matched = await self.backend.run(
+            lambda: self.backend.recommender.recommend_by_preferences(
+                cuisine, city, price, rating, top_n=top_n, explain=True,
+                min_cost=min_cost, max_cost=max_cost, rank_by=rank_by,
+            )
+        )
+        self.write_json({
+            "matched": matched,
+            "results": [dict(zip(RESULT_FIELDS, r)) for r in results],
+        })
+
+
+class UserRecommendHandler(BaseHandler):
+    async def get(self):
+        username = self.get_argument("username")
+        city = self.get_argument("city", "")
+        top_n = self.get_number("top_n", int, 10, minimum=1)
+        results = await self.backend.run(self.backend.recommender.recommend_for_user, username, city, top_n)
+        self.write_results(results)
+
+
+class CuisineChallengeHandler(BaseHandler):
+    async def get(self):
+        username = self.get_argument("username")
+        city = self.get_argument("city", "")
+        limit = self.get_number("limit", int, 3, minimum=1)
+        suggestions = await self.backend.run(
+            self.backend.recommender.suggest_cuisines, username, city, limit
+        )
+        self.write_json({"suggestions": [
+            dict(s, restaurants=[dict(zip(RESULT_FIELDS, r)) for r in s["restaurants"]])
+            for s in suggestions
+        ]})
+
+
+class SearchHandler(BaseHandler):
+    async def get(self):
+        query = self.get_argument("q")
+        city = self.get_argument("city", "")
+        top_n = self.get_number("top_n", int, 10, minimum=1)
+        results = await self.backend.run(self.search, query, city, top_n)
+        self.write_results(results)
+
+    def search(self, query, city, top_n):
+        # FTS5 row ids are dataset rows: pin the serving model (behind the
+        # reloader) and only use an index built from the version it loaded
+        recommender = self.backend.recommender
+        model = getattr(recommender, "current", recommender)
+        if not ensure_search_index(recommender.data_path, signature=model.data_signature):
+            raise tornado.web.HTTPError(503, reason="Dataset changed, search resumes after the model reloads")
+        # chain branches collapse into one result, so over-fetch
+        hits = search_restaurants(query, city, limit=top_n * 10)
+        return model.results_for_rows([r for r, _ in hits], [s for _, s in hits], top_n)
+
+
+class LeaderboardHandler(BaseHandler):
+    async def get(self):
+        rows = await self.backend.run(get_leaderboard)
+        self.write_json({"leaderboard": [{"username": u, "points": p} for u, p in rows]})
+
+
+class VisitHandler(BaseHandler):
+    async def post(self):
+        try:
+            body = json.loads(self.request.body or b"{}")
+            username = body["username"]
+            restaurant = body["restaurant"]
+        except (ValueError, KeyError, TypeError):
+            raise tornado.web.HTTPError(400, reason="Expected JSON with 'username' and 'restaurant'")
+        new_visit = await self.backend.run(self.visit, username, restaurant)
+        if new_visit is None:
+            raise tornado.web.HTTPError(404, reason=f"Unknown user '{username}'")
+        self.set_status(201 if new_visit else 200)
+        self.write_json({"username": username, "restaurant": restaurant, "new_visit": new_visit})
+
+    def visit(self, username, restaurant):
+        # on the pool: DB writes and the taste-vector update. None for an unknown user
+        if get_user_data(username) is None:
+            return None
+        new_visit = record_visit(username, restaurant)
+        if new_visit:
+            self.backend.recommender.add_visit(username, restaurant)
+        return new_visit
+
+
+def make_app(backend):
+    deps = {"backend": backend}
+    return tornado.web.Application([
+        (r"/health", HealthHandler, deps),
+        (r"/recommend", RecommendHandler, deps),
+        (r"/recommend/preferences", PreferencesHandler, deps),
+        (r"/recommend/user", UserRecommendHandler, deps),
+        (r"/challenges/cuisines", CuisineChallengeHandler, deps),
+        (r"/search", SearchHandler, deps),
+        (r"/leaderboard", LeaderboardHandler, deps),
+        (r"/visits", VisitHandler, deps),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON HTTP API for FoodQuest recommendations")
+    parser.add_argument("--data", default="data/Dataset.csv")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--workers", type=int, default=None, help="executor threads for scoring and DB calls")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING)
+    parser.add_argument("--reload-interval", type=float, default=POLL_INTERVAL,
+                        help="seconds between dataset change checks")
+    args = parser.parse_args()
+
+    init_db()
+    backend = Backend(
+        CoalescingRecommender(ReloadingRecommender(args.data, FoodRecommender, args.reload_interval)),
+        workers=args.workers, max_pending=args.max_pending,
+    )
+    make_app(backend).listen(args.port)
+    print(f"\n📡 FoodQuest API listening on http://localhost:{args.port}\n")
+    tornado.ioloop.IOLoop.current().start()
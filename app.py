@@ -1,24 +1,28 @@
 import streamlit as st
-from model.recommender import FoodRecommender
 from utils.gamification import (
     init_db, register_user, validate_user, reset_password,
-    add_points, get_user_data, assign_badge, get_leaderboard
+    assign_badge, get_leaderboard, record_visit
 )
-import pandas as pd
-from database.db import has_tried, add_user_history, get_user_badges
-from utils.map_utils import render_map_section
+from database.db import get_user_snapshot
+from utils.warmup import WarmUp
+from utils.ingest import dataset_signature
 import base64
+import importlib
 from pathlib import Path
 import os
 os.environ["STREAMLIT_SERVER_FILE_WATCHER_TYPE"] = "none"
 
+@st.cache_data
+def logo_data_url(path):
+    # read + base64 once per file, not on every rerun
+    return "data:image/png;base64," + base64.b64encode(Path(path).read_bytes()).decode()
+
 def render_logo_inline(path="assets/foodquest_logo.png", width=320):
     p = Path(path)
     if not p.exists():
         st.error(f"Logo not found: {path}")
         return
-    data = p.read_bytes()
-    data_url = "data:image/png;base64," + base64.b64encode(data).decode()
+    data_url = logo_data_url(path)
     st.markdown(
         f"""
         <div style="display:flex; justify-content:center; margin-top:10px; margin-bottom:0px;">
@@ -30,13 +34,99 @@ def render_logo_inline(path="assets/foodquest_logo.png", width=320):
 
 # ---- PAGE CONFIG ----
 st.set_page_config(page_title="FoodQuest", layout="wide")
-init_db()
 
 @st.cache_resource
-def load_recommender():
-    return FoodRecommender("data/Dataset.csv")
+def init_database():
+    # schema/index setup once per process, not on every rerun
+    init_db()
+    return True
+
+init_database()
+
+def build_recommender():
+    from model.coalesce import CoalescingRecommender
+    from model.recommender import FoodRecommender
+    from utils.reloader import ReloadingRecommender
+
+    # one shared model; identical concurrent queries from different sessions run once.
+    # A refreshed Dataset.csv is rebuilt in the background and swapped in without a restart.
+    return CoalescingRecommender(ReloadingRecommender("data/Dataset.csv", FoodRecommender))
 
-recommender = load_recommender()
+def warm_search_index():
+    import database.search as search
+    search.ensure_search_index("data/Dataset.csv")
+    return search
+
+@st.cache_resource
+def start_warmup():
+    # pandas / scikit-learn / pydeck and the model load in the background,
+    # so the login page renders without waiting for them. Stages run in
+    # order: the cheap ones the Dataset page needs go before the model build
+    return WarmUp([
+        ("pandas", lambda: importlib.import_module("pandas")),
+        ("maps", lambda: importlib.import_module("utils.map_utils")),
+        ("explorer", lambda: importlib.import_module("utils.explorer")),
+        ("search", warm_search_index),
+        ("recommender", build_recommender),
+    ]).start()
+
+warmup = start_warmup()
+
+@st.cache_resource(max_entries=1)
+def load_explorer(path, signature):
+    # rebuilt only when the file's mtime/size signature changes
+    from utils.explorer import DatasetExplorer
+    return DatasetExplorer.from_csv(path)
+
+def wait_for(stage):
+    # pages block here (behind a spinner) until their warm-up stage is ready
+    if not warmup.is_ready(stage):
+        with st.spinner("Warming up FoodQuest..."):
+            return warmup.wait(stage)
+    return warmup.wait(stage)
+
+# ---- RECOMMENDATION CARDS (fragments) ----
+# A click inside a fragment reruns only that fragment: "Try" redraws its own
+# card action, "Show on Map" redraws the list and its map, never the whole page.
+@st.fragment
+def try_action(key, name, addr, city, recommender):
+    if st.button("Try 🍽️", key=key):
+        # precise Zomato/Google search using name + address + city
+        from urllib.parse import quote_plus
+        query = quote_plus(f"{name} {addr} {city} zomato")
+        zomato_link = f"https://www.google.com/search?q={query}&btnI=1"
+
+        username = st.session_state.username
+        if record_visit(username, name, st.session_state.user):
+            recommender.add_visit(username, name)
+            st.success(f"You tried {name}! +5 points 🎉")
+        else:
+            st.info(f"You already tried {name} before 🍽️")
+        st.markdown(
+                f"<a href='{zomato_link}' target='_blank' style='font-size:16px;'>🔗 View on Zomato (precise)</a>",
+                unsafe_allow_html=True
+        )
+
+@st.fragment
+def recommendation_map(maps):
+    maps.render_map_section()
+
+@st.fragment
+def recommendation_list(prefix, score_icon, recommender, maps, limit=None):
+    recs = st.session_state.recommendations
+    for idx, (n, c, ci, sc, lat, lon, addr) in enumerate(recs[:limit] if limit else recs):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.markdown(f"**{n}** — _{c}_ ({ci}) | {score_icon} {sc}")
+            if addr:
+                st.caption(f"📍 {addr}")
+        with col2:
+            if st.button("Show on Map 🗺️", key=f"{prefix}showmap_{idx}_{n}"):
+                st.session_state.selected_map_restaurant = n
+            try_action(f"{prefix}try_{idx}_{n}", n, addr, ci, recommender)
+
+    # ---- 📍 Map Visualization (All restaurants together) ----
+    recommendation_map(maps)
 
 # ---- THEME TOGGLE STATE ----
 if "theme" not in st.session_state:
@@ -49,10 +139,8 @@ if "username" not in st.session_state:
     st.session_state.username = ""
 if "recommendations" not in st.session_state:
     st.session_state.recommendations = []
-if "tried_restaurants" not in st.session_state:
-    st.session_state.tried_restaurants = []
-if "tried_set" not in st.session_state:
-    st.session_state.tried_set = set()
+if "user" not in st.session_state:
+    st.session_state.user = None
 
 # ---- PAGE STATE ----
 if "page" not in st.session_state:
@@ -84,6 +172,7 @@ if not st.session_state.logged_in:
             if user:
                 st.session_state.logged_in = True
                 st.session_state.username = username
+                st.session_state.user = get_user_snapshot(username)
                 st.success(f"Welcome back, {username}!")
                 st.rerun()
             else:
@@ -109,6 +198,13 @@ if not st.session_state.logged_in:
 
     st.stop()
 
+# ---- USER SNAPSHOT ----
+# points, tried restaurants and badges: one DB round trip per login,
+# then kept current in place by record_visit()
+if st.session_state.user is None or st.session_state.user["username"] != st.session_state.username:
+    st.session_state.user = get_user_snapshot(st.session_state.username)
+user = st.session_state.user
+
 # ---- SIDEBAR ----
 with st.sidebar:
     # ---- THEME TOGGLE ABOVE USERNAME ----
@@ -135,27 +231,30 @@ with st.sidebar:
 
 # ---- THEME & UI STYLES (re-created from scratch; works for light & dark) ----
 # ---- COMPLETE FIXED THEME STYLING (final version) ----
-st.markdown(f"""
+@st.cache_data
+def theme_css(theme):
+    # the stylesheet only depends on the theme: format it once per theme
+    return f"""
 <style>
 /* ================== GLOBAL RESET ================== */
 * {{
     box-sizing: border-box !important;
 }}
 body, [data-testid="stAppViewContainer"] {{
-    background: {"linear-gradient(135deg,#1e1e1e 0%,#2a2a2a 100%)" if st.session_state.theme=="dark" else "linear-gradient(135deg,#f8f9fa 0%,#ffe4ec 100%)"} !important;
-    color: {"#f8f8f8" if st.session_state.theme=="dark" else "#222"} !important;
+    background: {"linear-gradient(135deg,#1e1e1e 0%,#2a2a2a 100%)" if theme=="dark" else "linear-gradient(135deg,#f8f9fa 0%,#ffe4ec 100%)"} !important;
+    color: {"#f8f8f8" if theme=="dark" else "#222"} !important;
     font-family: "Inter", sans-serif !important;
 }}
 
 [data-testid="stSidebar"] {{
-    background: {"linear-gradient(135deg,#232323 0%,#1b1b1b 100%)" if st.session_state.theme=="dark" else "linear-gradient(135deg,#fff3f6 0%,#ffe4ec 100%)"} !important;
-    color: {"#f8f8f8" if st.session_state.theme=="dark" else "#222"} !important;
+    background: {"linear-gradient(135deg,#232323 0%,#1b1b1b 100%)" if theme=="dark" else "linear-gradient(135deg,#fff3f6 0%,#ffe4ec 100%)"} !important;
+    color: {"#f8f8f8" if theme=="dark" else "#222"} !important;
     border-radius: 10px;
 }}
 
 /* ================== TEXT ELEMENTS ================== */
 h1,h2,h3,h4,h5,h6,p,span,label,div,li {{
-    color: {"#f8f8f8" if st.session_state.theme=="dark" else "#222"} !important;
+    color: {"#f8f8f8" if theme=="dark" else "#222"} !important;
 }}
 label {{
     font-weight: 600 !important;
@@ -163,9 +262,9 @@ label {{
 
 /* ================== INPUTS & SELECTBOX ================== */
 input, select, textarea, div[data-baseweb="select"] > div {{
-    background-color: {"#2b2b2b" if st.session_state.theme=="dark" else "#fff"} !important;
-    color: {"#f8f8f8" if st.session_state.theme=="dark" else "#222"} !important;
-    border: 1px solid {"#555" if st.session_state.theme=="dark" else "#ccc"} !important;
+    background-color: {"#2b2b2b" if theme=="dark" else "#fff"} !important;
+    color: {"#f8f8f8" if theme=="dark" else "#222"} !important;
+    border: 1px solid {"#555" if theme=="dark" else "#ccc"} !important;
     border-radius: 6px !important;
     padding: 10px 12px !important;
     font-size: 15px !important;
@@ -179,7 +278,7 @@ div[data-baseweb="select"] > div {{
 
 /* Placeholder fix */
 input::placeholder, textarea::placeholder {{
-    color: {"#aaa" if st.session_state.theme=="dark" else "#888"} !important;
+    color: {"#aaa" if theme=="dark" else "#888"} !important;
 }}
 
 /* Selected text inside select */
@@ -190,26 +289,26 @@ div[data-baseweb="select"] span {{
 
 /* ================== DROPDOWN POPOVER ================== */
 div[data-baseweb="popover"] {{
-    background-color: {"#2b2b2b" if st.session_state.theme=="dark" else "#fff"} !important;
-    border: 1px solid {"#555" if st.session_state.theme=="dark" else "#ccc"} !important;
+    background-color: {"#2b2b2b" if theme=="dark" else "#fff"} !important;
+    border: 1px solid {"#555" if theme=="dark" else "#ccc"} !important;
     border-radius: 8px !important;
     box-shadow: 0 6px 18px rgba(0,0,0,0.25) !important;
     overflow: hidden !important;
 }}
 div[data-baseweb="popover"] [role="option"] {{
     background-color: transparent !important;
-    color: {"#f8f8f8" if st.session_state.theme=="dark" else "#222"} !important;
+    color: {"#f8f8f8" if theme=="dark" else "#222"} !important;
     padding: 10px 14px !important;
     font-size: 15px !important;
     line-height: 1.4 !important;
 }}
 div[data-baseweb="popover"] [role="option"]:hover {{
-    background-color: {"#3b3b3b" if st.session_state.theme=="dark" else "#ffe4ec"} !important;
-    color: {"#ffffff" if st.session_state.theme=="dark" else "#000000"} !important;
+    background-color: {"#3b3b3b" if theme=="dark" else "#ffe4ec"} !important;
+    color: {"#ffffff" if theme=="dark" else "#000000"} !important;
 }}
 div[data-baseweb="popover"] [aria-selected="true"] {{
-    background-color: {"#444" if st.session_state.theme=="dark" else "#ffd6e4"} !important;
-    color: {"#fff" if st.session_state.theme=="dark" else "#000"} !important;
+    background-color: {"#444" if theme=="dark" else "#ffd6e4"} !important;
+    color: {"#fff" if theme=="dark" else "#000"} !important;
 }}
 
 /* Scrollbar styling */
@@ -217,11 +316,11 @@ div[data-baseweb="popover"]::-webkit-scrollbar {{
     width: 8px;
 }}
 div[data-baseweb="popover"]::-webkit-scrollbar-thumb {{
-    background-color: {"#555" if st.session_state.theme=="dark" else "#bbb"} !important;
+    background-color: {"#555" if theme=="dark" else "#bbb"} !important;
     border-radius: 10px;
 }}
 div[data-baseweb="popover"]::-webkit-scrollbar-thumb:hover {{
-    background-color: {"#777" if st.session_state.theme=="dark" else "#999"} !important;
+    background-color: {"#777" if theme=="dark" else "#999"} !important;
 }}
 
 /* ================== BUTTONS ================== */
@@ -262,7 +361,9 @@ div[data-baseweb="select"] div[role="combobox"] {{
     display: flex !important;
 }}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(theme_css(st.session_state.theme), unsafe_allow_html=True)
 
 # ---- FORCE DROPDOWN POPOVER DARK IN DARK MODE (paste after main styles) ----
 if st.session_state.theme == "dark":
@@ -384,6 +485,7 @@ st.sidebar.write("---")
 if st.sidebar.button("Logout"):
     st.session_state.logged_in = False
     st.session_state.username = ""
+    st.session_state.user = None
     st.rerun()
 
 page = st.session_state.selected_page
@@ -428,6 +530,9 @@ if "selected_map_restaurant" not in st.session_state:
 
 # ---- RECOMMEND BY RESTAURANT ----
 elif page == "Recommend by Restaurant":
+    pd = wait_for("pandas")
+    recommender = wait_for("recommender")
+    maps = wait_for("maps")
     st.title("🤖 Recommend by Restaurant")
 
     try:
@@ -438,12 +543,14 @@ elif page == "Recommend by Restaurant":
 
     city = st.selectbox("Select City:", sorted(df["City"].dropna().unique().tolist()))
     name = st.text_input("Enter restaurant name:")
+    # 0 = most similar first; higher mixes in other cuisines and styles
+    variety = st.slider("🎲 Variety", 0.0, 0.9, 0.0, 0.1)
 
     if st.button("Recommend"):
         if not name.strip():
             st.warning("Please enter a restaurant name first.")
         else:
-            res = recommender.recommend(name, city)
+            res = recommender.recommend(name, city, diversity=variety)
             if res:
                 st.session_state.recommendations = [
                     r for r in res if r[2].lower().strip() == city.lower().strip()
@@ -457,93 +564,70 @@ elif page == "Recommend by Restaurant":
 
     if st.session_state.recommendations:
         st.markdown("### 🍴 Recommended Restaurants:")
-        for idx, (rname, cuisine, cty, score, lat, lon, addr) in enumerate(st.session_state.recommendations):
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.markdown(f"**{rname}** — _{cuisine}_ ({cty}) | 🔹 {score}")
-                if addr:
-                    st.caption(f"📍 {addr}")
-            with col2:
-                show_key = f"showmap_{idx}_{rname}"
-                try_key = f"try_{idx}_{rname}"
-
-                if st.button("Show on Map 🗺️", key=show_key):
-                    st.session_state.selected_map_restaurant = rname
-
-                if st.button("Try 🍽️", key=try_key):
-                    # precise Zomato/Google search using name + address + city
-                    from urllib.parse import quote_plus
-                    query = quote_plus(f"{rname} {addr} {cty} zomato")
-                    zomato_link = f"https://www.google.com/search?q={query}&btnI=1"
-
-                    if not has_tried(username, rname):
-                        add_points(username, 5)
-                        add_user_history(username, rname)
-                        st.success(f"You tried {rname}! +5 points 🎉")
-                        
-                    else:
-                        st.info(f"You already tried {rname} before 🍽️")
-                    st.markdown(
-                            f"<a href='{zomato_link}' target='_blank' style='font-size:16px;'>🔗 View on Zomato (precise)</a>",
-                            unsafe_allow_html=True
-                    )
-
-
-        # ---- 📍 Map Visualization (All restaurants together) ----
-        render_map_section()
+        recommendation_list("", "🔹", recommender, maps)
 
 # ---- RECOMMEND BY PREFERENCES ----
 elif page == "Recommend by Preferences":
+    recommender = wait_for("recommender")
+    maps = wait_for("maps")
     st.title("🎯 Recommend by Preferences")
 
     cuisine = st.text_input("Cuisine:")
     city = st.text_input("City:")
     price = st.selectbox("💰 Price Range", [1, 2, 3, 4])
     rating = st.slider("⭐ Min Rating", 0.0, 5.0, 3.5, 0.1)
+    # optional budget, compared across currencies in rupees
+    max_cost = st.number_input("💵 Max cost for two (₹, 0 = no limit)", min_value=0, value=0, step=100)
+    rank_labels = {"Best match": "similarity", "Top rated (vote-weighted)": "quality", "Balanced": "blend"}
+    rank_by = st.radio("Rank by:", list(rank_labels), horizontal=True)
 
     if st.button("Find Restaurants"):
-        results = recommender.recommend_by_preferences(cuisine, city, price, rating)
+        results, matched = recommender.recommend_by_preferences(
+            cuisine, city, price, rating, explain=True, max_cost=max_cost or None,
+            rank_by=rank_labels[rank_by],
+        )
+        st.session_state.recommendations = results
+
+        if not results:
+            st.warning("No results found.")
+        elif matched != "all filters":
+            st.info(f"No restaurant matched every filter — results use: {matched}.")
+
+    # ---- FREE-TEXT SEARCH ----
+    craving = st.text_input("🔎 Or describe what you're craving (e.g. cafe italian pizza):")
+    if st.button("Search"):
+        results = recommender.recommend_by_text(craving, city)
         st.session_state.recommendations = results
 
         if not results:
             st.warning("No results found.")
 
+    # ---- PERSONALIZED (from visit history) ----
+    if st.button("✨ Recommend from my history"):
+        results = recommender.recommend_for_user(username, city, history=user["tried"] if user else None)
+        st.session_state.recommendations = results
+
+        if not results:
+            st.info("Try a few restaurants first — we'll learn your taste from them 🍽️")
+
+    # ---- CUISINE CHALLENGES (adjacent cuisines not tried yet) ----
+    if st.button("🧭 Suggest cuisines I haven't tried"):
+        challenges = recommender.suggest_cuisines(username, city, history=user["tried"] if user else None)
+        st.session_state.recommendations = [r for c in challenges for r in c["restaurants"]]
+        if challenges:
+            st.success("Your next challenge: " + " · ".join(
+                f"**{c['cuisine']}** (goes with {', '.join(c['because'][:2])})" for c in challenges
+            ))
+        else:
+            st.info("Try a few restaurants first — we'll suggest new cuisines to explore 🧭")
+
     # ---- SHOW RESULTS ----
     if st.session_state.recommendations:
-        for i, (n, c, ci, sc, lat, lon, addr) in enumerate(st.session_state.recommendations[:10]):
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.markdown(f"**{n}** — _{c}_ ({ci}) | ⭐ {sc}")
-                if addr:
-                    st.caption(f"📍 {addr}")
-            with col2:
-                show_key = f"pref_showmap_{i}_{n}"
-                try_key = f"pref_try_{i}_{n}"
-
-                if st.button("Show on Map 🗺️", key=show_key):
-                    st.session_state.selected_map_restaurant = n
-
-                if st.button("Try 🍽️", key=try_key):
-                    from urllib.parse import quote_plus
-                    query = quote_plus(f"{n} {addr} {ci} zomato")
-                    zomato_link = f"https://www.google.com/search?q={query}&btnI=1"
-
-                    if not has_tried(username, n):
-                        add_points(username, 5)
-                        add_user_history(username, n)
-                        st.success(f"You tried {n}! +5 points 🎉")
-                        
-                    else:
-                        st.info(f"You already tried {n} before 🍽️")
-                    st.markdown(
-                            f"<a href='{zomato_link}' target='_blank' style='font-size:16px;'>🔗 View on Zomato (precise)</a>",
-                            unsafe_allow_html=True
-                    )
-
-        render_map_section()
+        recommendation_list("pref_", "⭐", recommender, maps, limit=10)
 
 # ---- LEADERBOARD ----
 elif page == "Leaderboard":
+    pd = wait_for("pandas")
     st.title("🏆 FoodQuest Leaderboard")
     st.markdown("See who's climbing the culinary ranks 🍴🔥")
 
@@ -652,9 +736,8 @@ elif page == "Leaderboard":
 # ---- PROFILE ----
 elif page == "Profile":
     st.title("👤 Your Profile")
-    user_data = get_user_data(username)
-    if user_data:
-        points = user_data[2]
+    if user:
+        points = user["points"]
         badge = assign_badge(points)
         tiers = [
             ("🍴 Foodie Beginner", 0),
@@ -678,7 +761,7 @@ elif page == "Profile":
         else:
             next_badge, prev_req, next_req = "🏆 Maxed Out!", 200, 200
         progress = max(0, min((points - prev_req) / (next_req - prev_req) if next_req > prev_req else 1, 1))
-        st.subheader(f"Username: {user_data[0]}")
+        st.subheader(f"Username: {user['username']}")
         st.write(f"💰 Points: **{points}**")
         st.write(f"🏅 Current Badge: **{badge}**")
         st.markdown("---")
@@ -693,7 +776,7 @@ elif page == "Profile":
         """, unsafe_allow_html=True)
         st.markdown("---")
         st.subheader("🎖️ Badge History")
-        badges = get_user_badges(username)
+        badges = user["badges"]
         if badges:
             for badge_name, date, score in badges:
                 st.markdown(f"- {badge_name} — earned on **{date[:10]}**, score at that time: {score}")
@@ -704,114 +787,92 @@ elif page == "Profile":
 
 # ---- DATASET ----
 elif page == "Dataset":
+    wait_for("explorer")
+    maps = wait_for("maps")
     st.title("📊 Restaurant Dataset Explorer")
     try:
-        df = pd.read_csv("data/Dataset.csv").fillna("N/A")
+        explorer = load_explorer("data/Dataset.csv", dataset_signature("data/Dataset.csv"))
     except FileNotFoundError:
         st.error("Dataset not found in 'data/Dataset.csv'")
         st.stop()
 
     st.markdown("### 🎛️ Choose a filter type to explore:")
-    filter_type = st.radio("Select a filter type:", ["By Restaurant Name", "By City", "By Cuisine"], horizontal=True)
+    filter_type = st.radio(
+        "Select a filter type:", ["By Restaurant Name", "By City", "By Cuisine", "Full-text Search"], horizontal=True
+    )
 
     with st.expander("🔍 Filter Dataset", expanded=True):
-        col1, col2, col3 = st.columns(3)
-        name_filter = city_filter = cuisine_filter = ""
-        with col1:
-            if filter_type == "By Restaurant Name":
-                name_filter = st.text_input("Restaurant Name:")
-            else:
-                st.text_input("Restaurant Name:", disabled=True, placeholder="Disabled")
-        with col2:
-            if filter_type == "By City":
-                city_filter = st.text_input("City:")
-            else:
-                st.text_input("City:", disabled=True, placeholder="Disabled")
-        with col3:
-            if filter_type == "By Cuisine":
-                cuisine_filter = st.text_input("Cuisine:")
-            else:
-                st.text_input("Cuisine:", disabled=True, placeholder="Disabled")
-
-    # Filter the data safely
-    try:
-        filtered_df = df[
-            (df["Restaurant Name"].str.contains(name_filter, case=False, na=False) if name_filter else True)
-            & (df["City"].str.contains(city_filter, case=False, na=False) if city_filter else True)
-            & (df["Cuisines"].str.contains(cuisine_filter, case=False, na=False) if cuisine_filter else True)
-        ]
-    except Exception:
-        filtered_df = df
+        name_filter = city_filter = cuisine_filter = search_text = search_city = ""
+        if filter_type == "Full-text Search":
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                search_text = st.text_input("Search names, cuisines, localities and addresses:")
+            with col2:
+                search_city = st.text_input("City (optional):")
+        else:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if filter_type == "By Restaurant Name":
+                    name_filter = st.text_input("Restaurant Name:")
+                else:
+                    st.text_input("Restaurant Name:", disabled=True, placeholder="Disabled")
+            with col2:
+                if filter_type == "By City":
+                    city_filter = st.text_input("City:")
+                else:
+                    st.text_input("City:", disabled=True, placeholder="Disabled")
+            with col3:
+                if filter_type == "By Cuisine":
+                    cuisine_filter = st.text_input("Cuisine:")
+                else:
+                    st.text_input("Cuisine:", disabled=True, placeholder="Disabled")
 
-    if not name_filter and not city_filter and not cuisine_filter:
+    if not name_filter and not city_filter and not cuisine_filter and not search_text.strip():
         st.info("Enter a value in the selected filter above to explore the dataset 🔍")
         st.stop()
 
-    if filtered_df.empty:
-        st.warning("No results found for your filter.")
+    if search_text.strip():
+        # Ranked FTS5 search; the index is rebuilt when Dataset.csv changes
+        search = wait_for("search")
+        search.ensure_search_index("data/Dataset.csv")
+        hits = search.search_restaurants(search_text, search_city, limit=1000)
+        result = explorer.from_rows([row_id for row_id, _ in hits], f"{search_text}|{search_city}")
     else:
-        st.dataframe(
-            filtered_df[["Restaurant Name", "City", "Address", "Cuisines", "Aggregate rating", "Votes"]].head(100),
-            use_container_width=True, height=400
+        # Narrows the previous result when the text only got longer
+        result = explorer.query(
+            {"name": name_filter, "city": city_filter, "cuisine": cuisine_filter},
+            previous=st.session_state.get("explorer_result"),
         )
+    st.session_state.explorer_result = result
+
+    if not len(result):
+        st.warning("No results found for your filter.")
+    else:
+        sort_labels = {"Dataset order": None, "⭐ Rating (high → low)": "rating", "🗳️ Votes (high → low)": "votes"}
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            sort_by = st.selectbox("Sort by:", list(sort_labels))
+        with col2:
+            page_size = st.selectbox("Rows per page:", [25, 50, 100], index=2)
+        n_pages = max(1, -(-len(result) // page_size))
+        with col3:
+            # keyed on the query so a new filter or page size starts again at page 1
+            page_no = st.number_input(
+                f"Page (of {n_pages}):", min_value=1, max_value=n_pages, value=1, step=1,
+                key=f"explorer_page_{sorted(result.filters.items())}_{page_size}",
+            )
+
+        offset = (int(page_no) - 1) * page_size
+        page_df, total = explorer.page(result, sort_labels[sort_by], offset, page_size)
+        st.caption(f"Showing {offset + 1}–{offset + len(page_df)} of {total} restaurants")
+        st.dataframe(page_df, use_container_width=True, height=400)
         st.markdown("---")
         with st.expander("🗺️ View Restaurant Locations on Map", expanded=False):
             try:
-                import pydeck as pdk
-
-                # ✅ Use only coordinates from the filtered_df (no re-tallying)
-                map_df = filtered_df.copy()
-                map_df["Latitude"] = pd.to_numeric(map_df["Latitude"], errors="coerce")
-                map_df["Longitude"] = pd.to_numeric(map_df["Longitude"], errors="coerce")
-                map_df = map_df.dropna(subset=["Latitude", "Longitude"])
-                map_df = map_df.drop_duplicates(subset=["Restaurant Name", "City"])
-
-                if not map_df.empty:
-                    # Theme-based color scheme
-                    point_color = [255, 100, 100] if st.session_state.theme == "dark" else [255, 50, 50]
-
-                    # Create scatter layer (same config as recommendation pages)
-                    layer = pdk.Layer(
-                        "ScatterplotLayer",
-                        data=map_df,
-                        get_position='[Longitude, Latitude]',
-                        get_fill_color=point_color,
-                        get_radius=80,
-                        radius_scale=10,
-                        radius_min_pixels=4,
-                        radius_max_pixels=12,
-                        stroked=True,
-                        filled=True,
-                        line_width_min_pixels=1,
-                        get_line_color=[0, 0, 0, 100],
-                        opacity=0.45,
-                        pickable=True
-                    )
-
-                    # Center the map based on this filtered data only
-                    mean_lat = map_df["Latitude"].mean()
-                    mean_lon = map_df["Longitude"].mean()
-                    view_state = pdk.ViewState(latitude=mean_lat, longitude=mean_lon, zoom=10, pitch=0)
-
-                    # Tooltip (same hover info as others)
-                    tooltip = {
-                        "html": "<b>🍽️ {Restaurant Name}</b><br/>{Cuisines}<br/>⭐ {Aggregate rating}<br/>🏙️ {City}",
-                        "style": {
-                            "backgroundColor": "rgba(30,30,30,0.85)" if st.session_state.theme == "dark" else "rgba(255,255,255,0.9)",
-                            "color": "#fff" if st.session_state.theme == "dark" else "#000",
-                            "borderRadius": "6px",
-                            "padding": "6px"
-                        }
-                    }
-
-                    st.pydeck_chart(
-                        pdk.Deck(
-                            layers=[layer],
-                            initial_view_state=view_state,
-                            tooltip=tooltip,
-                            map_style=None
-                        )
-                    )
+                # Only map columns are sent; large results are grid-clustered
+                chart = maps.build_dataset_map(explorer.frame(result), st.session_state.theme)
+                if chart:
+                    st.pydeck_chart(chart)
                 else:
                     st.info("No valid location data found for these restaurants.")
             except Exception as e:
@@ -0,0 +1,180 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+RESULT_FIELDS = ("name", "cuisines", "city", "score", "latitude", "longitude", "address")
+
+# Set in every worker. With the fork start method the parent loads it once
+# and children share its pages copy-on-write instead of rebuilding.
+_MODEL = None
+
+# An input line that isn't valid JSON; written out as an error record in its place
+BadLine = namedtuple("BadLine", "line_no text error")
+
+
+# ---------- INPUT ----------
+def parse_jsonl(lines):
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield BadLine(line_no, line.rstrip("\r\n"), f"{type(e).__name__}: {e}")
+
+
+def read_queries(path):
+    """Stream query dicts from a .csv or .jsonl file ('-' = JSONL on stdin)."""
+    if path == "-":
+        yield from parse_jsonl(sys.stdin)
+    elif path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from parse_jsonl(f)
+
+
+def dataset_queries(data_path):
+    # one restaurant-based query per dataset row (CSV or ingested Parquet)
+    from utils.ingest import read_dataset
+    df = read_dataset(data_path)[["Restaurant Name", "City"]].fillna("")
+    for name, city in df.itertuples(index=False):
+        yield {"restaurant": name, "city": city}
+
+
+def batched(queries, size):
+    batch = []
+    for q in queries:
+        batch.append(q)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------- WORKER ----------
+def _load_model(data_path):
+    global _MODEL
+    if _MODEL is None:
+        from model.recommender import FoodRecommender
+        _MODEL = FoodRecommender(data_path)
+    return _MODEL
+
+
+def _number(value, cast):
+    if value in (None, ""):
+        return None
+    return cast(value)
+
+
+def run_query(model, q, top_n):
+    # the keys present decide which recommender runs
+    top_n = int(q.get("top_n") or top_n)
+    if q.get("restaurant"):
+        return model.recommend(q["restaurant"], q.get("city", ""), top_n, _number(q.get("diversity"), float) or 0.0)
+    if q.get("text"):
+        return model.recommend_by_text(q["text"], q.get("city", ""), top_n)
+    return model.recommend_by_preferences(
+        q.get("cuisine", ""), q.get("city", ""),
+        _number(q.get("price"), int), _number(q.get("rating"), float), top_n,
+        min_cost=_number(q.get("min_cost"), float), max_cost=_number(q.get("max_cost"), float),
+        rank_by=q.get("rank_by") or "similarity",
+    )
+
+
+def run_batch(batch, top_n):
+    model = _MODEL
+    lines = []
+    errors = 0
+    for q in batch:
+        if isinstance(q, BadLine):
+            lines.append(json.dumps({"line": q.line_no, "input": q.text, "error": q.error}, ensure_ascii=False))
+            errors += 1
+            continue
+        record = {"query": q}
+        try:
+            record["results"] = [dict(zip(RESULT_FIELDS, r)) for r in run_query(model, q, top_n)]
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            errors += 1
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return lines, errors
+
+
+# ---------- DRIVER ----------
+def run(queries, out, data_path, workers=None, batch_size=64, top_n=10, log=sys.stderr):
+    """
+    Fan query batches out to a process pool and write JSONL in input
+    order. At most 2 * workers batches are in flight, so memory stays
+    bounded however large the input is.
+    """
+    ctx = multiprocessing.get_context()
+    if ctx.get_start_method() == "fork":
+        _load_model(data_path)
+    workers = workers or multiprocessing.cpu_count()
+
+    start = time.perf_counter()
+    last_report = start
+    done = errors = 0
+    pending = deque()
+
+    def drain_one():
+        nonlocal done, errors
+        lines, failed = pending.popleft().result()
+        out.writelines(line + "\n" for line in lines)
+        done += len(lines)
+        errors += failed
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_model, initargs=(data_path,)) as pool:
+        for batch in batched(queries, batch_size):
+            if len(pending) >= 2 * workers:
+                drain_one()
+            pending.append(pool.submit(run_batch, batch, top_n))
+
+            now = time.perf_counter()
+            if now - last_report >= 2:
+                last_report = now
+                print(f"  {done} queries, {done / (now - start):.0f} q/s", file=log)
+        while pending:
+            drain_one()
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {done} queries ({errors} errors) in {elapsed:.1f}s -> {done / max(elapsed, 1e-9):.0f} q/s", file=log)
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Batch recommendations: stream queries from CSV/JSONL, write results as JSONL"
+    )
+    parser.add_argument("input", nargs="?", default=None,
+                        help="queries file (.csv or .jsonl, '-' for stdin); omit with --all-restaurants")
+    parser.add_argument("--all-restaurants", action="store_true", help="query every restaurant in --data")
+    parser.add_argument("--data", default="data/Dataset.csv")
+    parser.add_argument("--out", default="-", help="output JSONL file ('-' = stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--top-n", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.all_restaurants:
+        queries = dataset_queries(args.data)
+    elif args.input:
+        queries = read_queries(args.input)
+    else:
+        parser.error("give an input file or --all-restaurants")
+
+    print("\n📌 BATCH RECOMMENDATIONS\n", file=sys.stderr)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        run(queries, out, args.data, workers=args.workers, batch_size=args.batch_size, top_n=args.top_n)
+    finally:
+        if out is not sys.stdout:
+            out.close()
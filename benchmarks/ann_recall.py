@@ -0,0 +1,57 @@
+"""
+Recall@K of the approximate neighbour engines against the exact one.
+
+    python -m benchmarks.ann_recall --k 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from model.neighbors import LSHEngine
+from model.recommender import FoodRecommender
+
+# (n_tables, n_bits, max_bucket) settings to sweep
+LSH_CONFIGS = [
+    (4, 12, 100),
+    (8, 10, 200),
+    (16, 8, 200),
+    (24, 8, 400),
+]
+
+
+def recall_at_k(exact_sim, approx_sim, k):
+    # tie-aware: an approximate hit counts if it scores at least the exact k-th best
+    exact_k = exact_sim[:, :k]
+    valid = np.isfinite(exact_k).sum(axis=1)
+    has = valid > 0
+    kth = exact_k[np.arange(len(exact_k)), np.maximum(valid - 1, 0)]
+    hits = (approx_sim[:, :k] >= kth[:, None] - 1e-6).sum(axis=1)
+    return float((np.minimum(hits, valid)[has] / valid[has]).mean())
+
+
+def build(data_path, engine, k):
+    start = time.perf_counter()
+    model = FoodRecommender(data_path, n_neighbors=k, engine=engine)
+    return model, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default="data/Dataset.csv")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    exact, exact_time = build(args.data, "exact", args.k)
+    print(f"{'engine':<28}{'build s':>10}{'recall@' + str(args.k):>12}")
+    print(f"{'exact':<28}{exact_time:>10.2f}{1.0:>12.3f}")
+    for n_tables, n_bits, max_bucket in LSH_CONFIGS:
+        engine = LSHEngine(n_tables=n_tables, n_bits=n_bits, max_bucket=max_bucket)
+        approx, approx_time = build(args.data, engine, args.k)
+        recall = recall_at_k(exact.neighbor_sim, approx.neighbor_sim, args.k)
+        label = f"lsh tables={n_tables} bits={n_bits} cap={max_bucket}"
+        print(f"{label:<28}{approx_time:>10.2f}{recall:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Closed-loop load test for api_server.py.
+
+Keeps --concurrency requests in flight for --duration seconds, cycling
+through a mix of read endpoints, then reports requests per second and
+latency percentiles per endpoint. Start the server first:
+
+    python api_server.py --port 8888
+    python -m benchmarks.load_test --url http://localhost:8888 --concurrency 32
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode
+
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+REQUESTS = [
+    ("/recommend", {"restaurant": "jahanpanah", "city": "agra"}),
+    ("/recommend", {"restaurant": "domino", "city": "new delhi"}),
+    ("/recommend", {"restaurant": "haldiram", "city": "noida"}),
+    ("/recommend/preferences", {"cuisine": "north indian", "city": "delhi", "price": 2, "rating": 3.5}),
+    ("/recommend/preferences", {"cuisine": "italian", "city": "gurgaon", "price": 3, "rating": 4.0}),
+    ("/leaderboard", {}),
+]
+
+
+async def worker(client, base_url, mix, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        path, params = next(mix)
+        url = f"{base_url}{path}?{urlencode(params)}" if params else base_url + path
+        start = time.perf_counter()
+        try:
+            response = await client.fetch(url, raise_error=False)
+            code = response.code
+        except (HTTPClientError, OSError):
+            code = 599
+        latencies[path].append(time.perf_counter() - start)
+        statuses[code] += 1
+
+
+async def run(base_url, concurrency, duration):
+    AsyncHTTPClient.configure(None, max_clients=concurrency)
+    client = AsyncHTTPClient()
+    mix = itertools.cycle(REQUESTS)
+    latencies = defaultdict(list)
+    statuses = Counter()
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        worker(client, base_url, mix, deadline, latencies, statuses) for _ in range(concurrency)
+    ))
+    return time.perf_counter() - start, latencies, statuses
+
+
+def report(elapsed, latencies, statuses):
+    everything = np.concatenate([np.asarray(v) for v in latencies.values()])
+    print(f"{'endpoint':<26}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for path, values in list(latencies.items()) + [("all", everything)]:
+        ms = np.asarray(values) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"{path:<26}{len(ms):>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    print(f"\n{len(everything)} requests in {elapsed:.1f}s -> {len(everything) / elapsed:.1f} req/s")
+    print("status codes:", dict(sorted(statuses.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the FoodQuest HTTP API")
+    parser.add_argument("--url", default="http://localhost:8888")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    args = parser.parse_args()
+
+    report(*asyncio.run(run(args.url.rstrip("/"), args.concurrency, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+End-to-end page render benchmark: drives app.py headlessly with
+Streamlit's AppTest and times every rerun of a fixed click-through
+(login, both recommendation pages with "Try" clicks, Leaderboard,
+Profile, Dataset filters and full-text search).
+
+Each pass runs against a fresh copy of the database with a seeded user,
+so every pass issues the same queries. Per step it reports the median
+rerun time and the SQL statements issued. Save a baseline once, then
+compare later runs against it; the exit code is 1 on a regression.
+
+    python -m benchmarks.page_render --save-baseline benchmarks/page_render_baseline.json
+    python -m benchmarks.page_render --baseline benchmarks/page_render_baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+import database.db as db
+
+BENCH_USER = ("bench_user", "bench-pass")
+# restaurants already in the seeded user's history (for Profile and personalisation)
+SEED_VISITS = ["Pind Balluchi", "Jahanpanah", "Barbeque Nation"]
+# timings below this many ms are noise, never a regression
+MIN_REGRESSION_MS = 5.0
+
+
+class QueryCounter:
+    """Counts connections and statements on the benchmark database."""
+
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        self.connections = 0
+        self.statements = 0
+        self._connect = sqlite3.connect
+
+    def __enter__(self):
+        def connect(database, *args, **kwargs):
+            conn = self._connect(database, *args, **kwargs)
+            if os.path.abspath(str(database)) == self.db_path:
+                self.connections += 1
+                conn.set_trace_callback(self._count)
+            return conn
+        sqlite3.connect = connect
+        return self
+
+    def __exit__(self, *exc):
+        sqlite3.connect = self._connect
+
+    def _count(self, statement):
+        self.statements += 1
+
+    def reset(self):
+        self.connections = self.statements = 0
+
+
+# ---------- SCENARIO ----------
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def _first_try(at):
+    # first "Try" card the user has not tried yet
+    tried = at.session_state.user["tried"]
+    for i, r in enumerate(at.session_state.recommendations):
+        if r[0] not in tried:
+            return [b for b in at.button if b.label.startswith("Try")][i]
+    raise RuntimeError("no untried recommendation to click")
+
+
+def _page(name):
+    def go(at):
+        at.session_state.selected_page = name
+        at.run()
+    return go
+
+
+def _login(at):
+    at.text_input[0].set_value(BENCH_USER[0])
+    at.text_input[1].set_value(BENCH_USER[1])
+    _button(at, "Login").click().run()
+
+
+def _recommend_by_restaurant(at):
+    at.selectbox[0].set_value("Agra")
+    at.text_input[0].set_value("jahanpanah")
+    _button(at, "Recommend").click().run()
+
+
+def _recommend_by_preferences(at):
+    at.text_input[0].set_value("italian")
+    at.text_input[1].set_value("gurgaon")
+    _button(at, "Find Restaurants").click().run()
+
+
+def _filter(mode, label, value):
+    def run(at):
+        next(r for r in at.radio if r.label == "Select a filter type:").set_value(mode).run()
+        next(t for t in at.text_input if t.label == label and not t.disabled).set_value(value).run()
+    return run
+
+
+STEPS = [
+    ("login", _login),
+    ("home rerun", lambda at: at.run()),
+    ("restaurant page", _page("Recommend by Restaurant")),
+    ("restaurant recommend", _recommend_by_restaurant),
+    ("restaurant try", lambda at: _first_try(at).click().run()),
+    ("preferences page", _page("Recommend by Preferences")),
+    ("preferences find", _recommend_by_preferences),
+    ("preferences try", lambda at: _first_try(at).click().run()),
+    ("leaderboard", _page("Leaderboard")),
+    ("profile", _page("Profile")),
+    ("dataset page", _page("Dataset")),
+    ("dataset by city", _filter("By City", "City:", "delhi")),
+    ("dataset narrow", _filter("By City", "City:", "new delhi")),
+    ("dataset search", _filter("Full-text Search", "Search names, cuisines, localities and addresses:", "pizza")),
+]
+
+
+def seed_database(template, path):
+    shutil.copy(template, path)
+    db.DB_PATH = path
+    db.init_db()
+    db.register_user(*BENCH_USER)
+    for name in SEED_VISITS:
+        db.add_user_history(BENCH_USER[0], name)
+
+
+def run_pass(template, work_dir, timeout):
+    """One click-through on a fresh database. Returns {step: (ms, statements, connections)}."""
+    db_path = os.path.join(work_dir, "bench.db")
+    seed_database(template, db_path)
+    results = {}
+    with QueryCounter(db_path) as counter:
+        at = AppTest.from_file("app.py", default_timeout=timeout)
+        at.run()   # login page
+        for label, step in STEPS:
+            counter.reset()
+            start = time.perf_counter()
+            step(at)
+            elapsed = (time.perf_counter() - start) * 1000
+            if at.exception:
+                raise RuntimeError(f"{label}: {at.exception[0].message}")
+            results[label] = (elapsed, counter.statements, counter.connections)
+    return results
+
+
+# ---------- REPORT ----------
+def summarize(passes):
+    return {
+        label: {
+            "ms": round(statistics.median(p[label][0] for p in passes), 2),
+            "queries": max(p[label][1] for p in passes),
+            "connections": max(p[label][2] for p in passes),
+        }
+        for label, _ in STEPS
+    }
+
+
+def compare(summary, baseline, threshold):
+    """Rows of (label, current, baseline, verdict); verdict 'REGRESSION' fails the run."""
+    rows = []
+    for label, cur in summary.items():
+        base = baseline.get(label)
+        if base is None:
+            rows.append((label, cur, None, "new"))
+            continue
+        slower = cur["ms"] > base["ms"] * (1 + threshold) and cur["ms"] - base["ms"] > MIN_REGRESSION_MS
+        more_queries = cur["queries"] > base["queries"]
+        rows.append((label, cur, base, "REGRESSION" if slower or more_queries else "ok"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end Streamlit page render benchmark (AppTest)")
+    parser.add_argument("--passes", type=int, default=5, help="measured click-throughs (median is reported)")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured passes (model build, caches)")
+    parser.add_argument("--db", default=db.DB_PATH, help="template database, copied for every pass")
+    parser.add_argument("--timeout", type=float, default=180, help="seconds allowed per rerun")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown over the baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", help="write this run's results as the new baseline")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="foodquest-bench-")
+    try:
+        for _ in range(args.warmup):
+            run_pass(args.db, work_dir, args.timeout)
+        passes = [run_pass(args.db, work_dir, args.timeout) for _ in range(args.passes)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    summary = summarize(passes)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["steps"]
+        print(f"{'step':<24}{'ms':>10}{'base ms':>10}{'queries':>9}{'base':>6}  verdict")
+        for label, cur, base, verdict in compare(summary, baseline, args.threshold):
+            base_ms = f"{base['ms']:>10.1f}" if base else f"{'-':>10}"
+            base_q = f"{base['queries']:>6}" if base else f"{'-':>6}"
+            print(f"{label:<24}{cur['ms']:>10.1f}{base_ms}{cur['queries']:>9}{base_q}  {verdict}")
+            failed |= verdict == "REGRESSION"
+    else:
+        print(f"{'step':<24}{'ms':>10}{'queries':>9}{'conns':>7}")
+        for label, cur in summary.items():
+            print(f"{label:<24}{cur['ms']:>10.1f}{cur['queries']:>9}{cur['connections']:>7}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"passes": args.passes, "steps": summary}, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Hammer one shared FoodRecommender from many threads.
+
+Checks that every concurrent answer equals the single-threaded one and
+reports throughput per thread count. With --with-writer a background
+thread keeps adding/removing a restaurant in its own city while readers run.
+With --coalesce queries go through CoalescingRecommender and the
+single-flight stats are printed at the end.
+
+    python -m benchmarks.stress_recommender --threads 1 2 4 8 16
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from model.coalesce import CoalescingRecommender
+from model.recommender import FoodRecommender
+
+QUERIES = [
+    ("recommend", ("jahanpanah", "agra")),
+    ("recommend", ("domino", "new delhi")),
+    ("recommend", ("haldiram", "noida")),
+    ("recommend", ("barbeque nation", "new delhi")),
+    ("recommend_by_text", ("cafe italian pizza", "new delhi")),
+    ("recommend_by_text", ("chinese momos", "gurgaon")),
+    ("recommend_by_preferences", ("north indian", "delhi", 2, 3.5)),
+    ("recommend_by_preferences", ("italian", "gurgaon", 3, 4.0)),
+    ("recommend_by_preferences", ("sushi", "agra", 4, 4.9)),
+]
+
+STRESS_ROW = {
+    "Restaurant ID": -1, "Restaurant Name": "Stress Test Kitchen", "Country Code": 1,
+    "City": "Stress Town", "Address": "1 Test Street", "Locality": "Test", "Locality Verbose": "Test",
+    "Longitude": 77.0, "Latitude": 28.0, "Cuisines": "North Indian, Chinese",
+    "Average Cost for two": 500, "Currency": "Indian Rupees(Rs.)", "Has Table booking": "No",
+    "Has Online delivery": "No", "Is delivering now": "No", "Switch to order menu": "No",
+    "Price range": 2, "Aggregate rating": 4.0, "Rating color": "Green", "Rating text": "Very Good",
+    "Votes": 10,
+}
+
+
+def run(model, query):
+    method, args = query
+    return getattr(model, method)(*args)
+
+
+def writer_loop(model, stop):
+    writes = 0
+    while not stop.is_set():
+        model.add_restaurants([STRESS_ROW])
+        model.remove_restaurant(STRESS_ROW["Restaurant ID"])
+        writes += 2
+    return writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent read stress test for FoodRecommender")
+    parser.add_argument("--data", default="data/Dataset.csv")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rounds", type=int, default=30, help="passes over the query mix per thread count")
+    parser.add_argument("--with-writer", action="store_true")
+    parser.add_argument("--coalesce", action="store_true", help="wrap the model in CoalescingRecommender")
+    args = parser.parse_args()
+
+    model = FoodRecommender(args.data)
+    if args.coalesce:
+        model = CoalescingRecommender(model)
+    # preference scores average over every row, so a live writer shifts them
+    queries = [q for q in QUERIES if not (args.with_writer and q[0] == "recommend_by_preferences")]
+    expected = [run(model, q) for q in queries]
+    jobs = list(range(len(queries))) * args.rounds
+
+    stop = threading.Event()
+    writer = None
+    if args.with_writer:
+        writer_pool = ThreadPoolExecutor(max_workers=1)
+        writer = writer_pool.submit(writer_loop, model, stop)
+
+    print(f"{'threads':>8}{'queries':>10}{'q/s':>10}{'mismatches':>12}")
+    baseline = None
+    for n_threads in args.threads:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_threads) as pool:
+            answers = list(pool.map(lambda i: (i, run(model, queries[i])), jobs))
+        elapsed = time.perf_counter() - start
+        mismatches = sum(answer != expected[i] for i, answer in answers)
+        qps = len(jobs) / elapsed
+        baseline = baseline or qps
+        print(f"{n_threads:>8}{len(jobs):>10}{qps:>10.1f}{mismatches:>12}   x{qps / baseline:.2f}")
+
+    if writer:
+        stop.set()
+        print(f"writer published {writer.result()} versions during the run")
+        writer_pool.shutdown()
+
+    if args.coalesce:
+        print(f"single-flight: {model.stats()}")
+
+
+if __name__ == "__main__":
+    main()
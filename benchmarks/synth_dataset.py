@@ -0,0 +1,225 @@
+"""
+Synthetic restaurant dataset at any scale, for scaling benchmarks.
+
+Learns the distributions of the real dataset (cities, localities and
+their coordinates, cuisine combinations per city, price range per city,
+cost / rating / votes / service flags per price range, rating bands,
+name vocabulary) and samples N rows with the same 21 columns. Output is
+streamed chunk by chunk to CSV or Parquet, so memory stays flat however
+many rows are asked for. Same seed + rows + chunk size = same file.
+
+    python -m benchmarks.synth_dataset --rows 1000000 --out data/synthetic_1m.parquet --seed 7
+    python -m benchmarks.stress_recommender --data data/synthetic_1m.parquet
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import arrow_schema, read_dataset
+
+CHUNK_SIZE = 100_000
+# Share of rows named after a real restaurant (chains repeat), the rest get composed names
+CHAIN_RATE = 0.3
+# Share of rows whose cuisine combination is new rather than one seen in the city
+NOVEL_COMBO_RATE = 0.15
+# Coordinate jitter around a locality's centre, in degrees (~400 m)
+COORD_JITTER = 0.004
+FIRST_ID = 100_000_000
+FLAG_COLUMNS = ["Has Table booking", "Has Online delivery", "Is delivering now", "Switch to order menu"]
+
+
+def _distribution(series):
+    counts = series.value_counts()
+    return counts.index.to_numpy(dtype=object), (counts / counts.sum()).to_numpy()
+
+
+class DatasetProfile:
+    """Empirical distributions of a real dataset, conditioned where it matters."""
+
+    def __init__(self, df):
+        df = df.fillna('')
+        self.columns = list(df.columns)
+        self.cities, self.city_p = _distribution(df['City'])
+        self.country = df.groupby('City')['Country Code'].first().to_dict()
+        self.currency = df.groupby('Country Code')['Currency'].first().to_dict()
+
+        # per city: localities with their centres, cuisine combinations, price ranges
+        self.localities, self.combos, self.prices = {}, {}, {}
+        for city, group in df.groupby('City'):
+            loc = group.groupby(['Locality', 'Locality Verbose']).agg(
+                lat=('Latitude', 'median'), lon=('Longitude', 'median'), n=('Latitude', 'size')
+            ).reset_index()
+            self.localities[city] = (loc, (loc['n'] / loc['n'].sum()).to_numpy())
+            self.combos[city] = _distribution(group['Cuisines'])
+            self.prices[city] = _distribution(group['Price range'])
+
+        # novel combinations: length and cuisines from the overall marginals
+        lists = df['Cuisines'].str.split(',').map(lambda cs: [c.strip() for c in cs if c.strip()])
+        self.combo_len = _distribution(lists.map(len).clip(lower=1))
+        self.cuisines = _distribution(lists.explode().dropna())
+
+        # per price range: real (cost, rating, votes) rows and flag probabilities
+        self.by_price = {}
+        for price, group in df.groupby('Price range'):
+            self.by_price[price] = (
+                group[['Average Cost for two', 'Aggregate rating', 'Votes']].to_numpy(dtype=float),
+                {c: float((group[c] == 'Yes').mean()) for c in FLAG_COLUMNS},
+            )
+
+        # rating bands (color, text) by the lowest rating seen in each
+        bands = df.groupby(['Rating color', 'Rating text'])['Aggregate rating'].min().sort_values()
+        self.band_floor = bands.to_numpy()
+        self.band_labels = list(bands.index)
+        rated = df.loc[df['Aggregate rating'] > 0, 'Aggregate rating']
+        self.rating_range = (float(rated.min()), float(rated.max()))
+
+        self.names = _distribution(df['Restaurant Name'])
+        words = df['Restaurant Name'].str.split()
+        self.first_words = _distribution(words.str[0].dropna())
+        self.last_words = _distribution(words[words.str.len() > 1].str[-1])
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(read_dataset(path))
+
+    # ---------- SAMPLING ----------
+    def sample(self, n, rng, first_id):
+        """One chunk of n synthetic rows as a DataFrame with the real columns."""
+        city = self.cities[rng.choice(len(self.cities), n, p=self.city_p)]
+        out = {
+            'Locality': np.empty(n, dtype=object), 'Locality Verbose': np.empty(n, dtype=object),
+            'Latitude': np.empty(n), 'Longitude': np.empty(n),
+            'Cuisines': np.empty(n, dtype=object), 'Price range': np.empty(n, dtype=np.int64),
+        }
+        for c in np.unique(city):
+            rows = np.flatnonzero(city == c)
+            loc, loc_p = self.localities[c]
+            pick = rng.choice(len(loc), len(rows), p=loc_p)
+            out['Locality'][rows] = loc['Locality'].to_numpy()[pick]
+            out['Locality Verbose'][rows] = loc['Locality Verbose'].to_numpy()[pick]
+            out['Latitude'][rows] = loc['lat'].to_numpy()[pick] + rng.normal(0, COORD_JITTER, len(rows))
+            out['Longitude'][rows] = loc['lon'].to_numpy()[pick] + rng.normal(0, COORD_JITTER, len(rows))
+            combos, combo_p = self.combos[c]
+            out['Cuisines'][rows] = combos[rng.choice(len(combos), len(rows), p=combo_p)]
+            prices, price_p = self.prices[c]
+            out['Price range'][rows] = prices[rng.choice(len(prices), len(rows), p=price_p)].astype(np.int64)
+
+        novel = np.flatnonzero(rng.random(n) < NOVEL_COMBO_RATE)
+        lengths = self.combo_len[0][rng.choice(len(self.combo_len[0]), len(novel), p=self.combo_len[1])]
+        for i, k in zip(novel, lengths):
+            picked = rng.choice(len(self.cuisines[0]), int(k), replace=False, p=self.cuisines[1])
+            out['Cuisines'][i] = ", ".join(self.cuisines[0][picked])
+
+        cost = np.empty(n)
+        rating = np.empty(n)
+        votes = np.empty(n)
+        flags = {c: np.empty(n, dtype=object) for c in FLAG_COLUMNS}
+        for price in np.unique(out['Price range']):
+            rows = np.flatnonzero(out['Price range'] == price)
+            real, flag_p = self.by_price[price]
+            cost[rows], rating[rows], votes[rows] = real[rng.integers(0, len(real), len(rows))].T
+            for c, p in flag_p.items():
+                flags[c][rows] = np.where(rng.random(len(rows)) < p, 'Yes', 'No')
+
+        # jitter ratings and votes; unrated rows (0.0, no votes) stay unrated
+        rated = rating > 0
+        rating[rated] = np.clip(np.round(rating[rated] + rng.normal(0, 0.15, rated.sum()), 1), *self.rating_range)
+        votes = np.where(rated, np.round(votes * rng.lognormal(0, 0.3, n)), 0).astype(np.int64)
+        band = np.searchsorted(self.band_floor, rating, 'right') - 1
+        band = np.clip(band, 0, len(self.band_labels) - 1)
+
+        chain = rng.random(n) < CHAIN_RATE
+        first = self.first_words[0][rng.choice(len(self.first_words[0]), n, p=self.first_words[1])]
+        last = self.last_words[0][rng.choice(len(self.last_words[0]), n, p=self.last_words[1])]
+        names = np.where(
+            chain,
+            self.names[0][rng.choice(len(self.names[0]), n, p=self.names[1])],
+            pd.Series(first).str.cat(pd.Series(last), sep=" ").to_numpy(dtype=object),
+        )
+        country = pd.Series(city).map(self.country).to_numpy(dtype=np.int64)
+
+        df = pd.DataFrame({
+            'Restaurant ID': np.arange(first_id, first_id + n, dtype=np.int64),
+            'Restaurant Name': names,
+            'Country Code': country,
+            'City': city,
+            'Address': pd.Series(rng.integers(1, 400, n).astype(str)).str.cat(
+                pd.Series(out['Locality Verbose']), sep=", ").to_numpy(dtype=object),
+            'Locality': out['Locality'],
+            'Locality Verbose': out['Locality Verbose'],
+            'Longitude': out['Longitude'].round(6),
+            'Latitude': out['Latitude'].round(6),
+            'Cuisines': out['Cuisines'],
+            'Average Cost for two': cost.astype(np.int64),
+            'Currency': pd.Series(country).map(self.currency).to_numpy(dtype=object),
+            **flags,
+            'Price range': out['Price range'],
+            'Aggregate rating': rating,
+            'Rating color': [self.band_labels[b][0] for b in band],
+            'Rating text': [self.band_labels[b][1] for b in band],
+            'Votes': votes,
+        })
+        return df[self.columns]
+
+
+# ---------- OUTPUT ----------
+def generate(profile, rows, out_path, seed=0, chunk_size=CHUNK_SIZE, log=print):
+    """Stream `rows` synthetic restaurants to out_path (.csv or .parquet)."""
+    if rows < 1 or chunk_size < 1:
+        raise ValueError(f"rows and chunk_size must be at least 1, got {rows} and {chunk_size}")
+    start = time.perf_counter()
+    parquet = out_path.lower().endswith(".parquet")
+    tmp_path = out_path + ".tmp"
+    writer = None
+    if parquet:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = arrow_schema()
+        writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+
+    try:
+        written = 0
+        for index, offset in enumerate(range(0, rows, chunk_size)):
+            # one generator per chunk: output depends only on seed, rows and chunk size
+            rng = np.random.default_rng([seed, index])
+            chunk = profile.sample(min(chunk_size, rows - offset), rng, FIRST_ID + offset)
+            if parquet:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            else:
+                chunk.to_csv(tmp_path, mode="w" if index == 0 else "a", header=index == 0, index=False)
+            written += len(chunk)
+            log(f"  {written}/{rows} rows ({written / (time.perf_counter() - start):.0f} rows/s)")
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+    os.replace(tmp_path, out_path)
+    log(f"Wrote {rows} synthetic restaurants to {out_path} in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic restaurant dataset")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--out", required=True, help="output .csv or .parquet")
+    parser.add_argument("--source", default="data/Dataset.csv", help="real dataset to learn from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.rows < 1:
+        parser.error("--rows must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    profile = DatasetProfile.from_file(args.source)
+    generate(profile, args.rows, args.out, seed=args.seed, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import argparse
+
+from model.neighbor_store import NEIGHBOR_DB_PATH, build_neighbor_db
+from model.recommender import N_NEIGHBORS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Precompute top-K same-city neighbours into SQLite for FoodRecommender.from_neighbor_db()"
+    )
+    parser.add_argument("--data", default="data/Dataset.csv")
+    parser.add_argument("--db", default=NEIGHBOR_DB_PATH)
+    parser.add_argument("--k", type=int, default=N_NEIGHBORS)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--engine", default="exact", choices=["exact", "lsh"])
+    args = parser.parse_args()
+
+    print("\n📌 BUILDING NEIGHBOUR TABLE\n")
+    build_neighbor_db(args.data, args.db, k=args.k, workers=args.workers, engine=args.engine)
@@ -44,6 +44,18 @@ def init_db():
         )
     """)
 
+    # ---- INDEXES (per-user lookups) ----
+    # one history row per (user, restaurant): a visit from a second session can't count twice.
+    # Older databases had a plain index and may hold duplicates; keep the first row of each.
+    cur.execute("""
+        DELETE FROM user_restaurant_history WHERE id NOT IN (
+            SELECT MIN(id) FROM user_restaurant_history GROUP BY username, restaurant_name
+        )
+    """)
+    cur.execute("DROP INDEX IF EXISTS idx_history_user_restaurant")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_history_user_restaurant_unique ON user_restaurant_history (username, restaurant_name)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_badges_user ON user_badges (username, earned_on)")
+
     conn.commit()
     conn.close()
 
@@ -106,11 +118,13 @@ def add_points(username, points):
     conn.close()
 
     # ---- After updating points, check for badge upgrade ----
+    # returns the newly awarded badges as (badge_name, score) pairs
     try:
         from utils.gamification import check_and_award_badge
-        check_and_award_badge(username)
+        return check_and_award_badge(username)
     except Exception as e:
         print("Badge awarding failed:", e)
+        return []
 
 def get_user_data(username):
     conn = get_connection()
@@ -120,6 +134,33 @@ def get_user_data(username):
     conn.close()
     return user
 
+def get_user_snapshot(username):
+    """
+    Everything the app shows about one user, read over a single
+    connection: points, tried count, the set of tried restaurants and
+    badges (newest first). None if the user doesn't exist.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT username, points, join_date, tried_count FROM users WHERE username=?", (username,))
+    user = cur.fetchone()
+    if not user:
+        conn.close()
+        return None
+    cur.execute("SELECT restaurant_name FROM user_restaurant_history WHERE username=?", (username,))
+    tried = {r[0] for r in cur.fetchall()}
+    cur.execute("SELECT badge_name, earned_on, score_at_time FROM user_badges WHERE username=? ORDER BY earned_on DESC", (username,))
+    badges = cur.fetchall()
+    conn.close()
+    return {
+        "username": user[0],
+        "points": user[1],
+        "join_date": user[2],
+        "tried_count": user[3],
+        "tried": tried,
+        "badges": badges,
+    }
+
 def get_leaderboard():
     conn = get_connection()
     cur = conn.cursor()
@@ -130,19 +171,22 @@ def get_leaderboard():
 
 # ---------- RESTAURANT HISTORY ----------
 def add_user_history(username, restaurant_name):
+    # True if recorded, False if the user had already tried it
     conn = get_connection()
     cur = conn.cursor()
-    cur.execute("INSERT INTO user_restaurant_history (username, restaurant_name) VALUES (?, ?)", (username, restaurant_name))
+    cur.execute("INSERT OR IGNORE INTO user_restaurant_history (username, restaurant_name) VALUES (?, ?)", (username, restaurant_name))
+    added = cur.rowcount == 1
     conn.commit()
     conn.close()
+    return added
 
-def has_tried(username, restaurant_name):
+def get_user_history(username):
     conn = get_connection()
     cur = conn.cursor()
-    cur.execute("SELECT 1 FROM user_restaurant_history WHERE username=? AND restaurant_name=?", (username, restaurant_name))
-    result = cur.fetchone()
+    cur.execute("SELECT restaurant_name FROM user_restaurant_history WHERE username=?", (username,))
+    names = {r[0] for r in cur.fetchall()}
     conn.close()
-    return result is not None
+    return names
 
 # ---------- BADGES ----------
 def add_user_badge(username, badge_name, score):
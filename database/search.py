@@ -0,0 +1,174 @@
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils.ingest import dataset_signature
+
+# Full-text index lives next to the app database, rebuilt from the dataset
+SEARCH_DB_PATH = "database/search.db"
+
+# Searchable columns and their bm25 weights (a name hit counts most)
+SEARCH_FIELDS = {
+    "name": ("Restaurant Name", 10.0),
+    "cuisines": ("Cuisines", 5.0),
+    "locality": ("Locality Verbose", 2.0),
+    "address": ("Address", 1.0),
+}
+
+SCHEMA = """
+CREATE VIRTUAL TABLE restaurants_fts USING fts5(
+    name, cuisines, locality, address,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TABLE restaurant_city (row_id INTEGER PRIMARY KEY, city_clean TEXT);
+CREATE INDEX idx_restaurant_city ON restaurant_city (city_clean, row_id);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+# one rebuild at a time per process
+_build_lock = threading.Lock()
+
+
+def get_connection(db_path=SEARCH_DB_PATH):
+    return sqlite3.connect(db_path)
+
+
+def index_signature(db_path=SEARCH_DB_PATH):
+    """Signature of the dataset version the index was built from (None if missing/unreadable)."""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = get_connection(db_path)
+        row = conn.execute("SELECT value FROM meta WHERE key='signature'").fetchone()
+        conn.close()
+    except sqlite3.DatabaseError:
+        return None   # unreadable / old layout: rebuild
+    return row[0] if row else None
+
+
+# ---------- BUILD ----------
+def build_search_index(data_path="data/Dataset.csv", db_path=SEARCH_DB_PATH):
+    """
+    (Re)build the FTS5 index. rowid = row position in the dataset, i.e.
+    the same row numbering FoodRecommender and DatasetExplorer use.
+    Built in a temp file of its own and swapped in, so readers never see
+    it half done. Returns the signature of the dataset version indexed.
+    """
+    from utils.ingest import read_dataset
+
+    start = time.perf_counter()
+    signature = dataset_signature(data_path)
+    df = read_dataset(data_path).fillna('')
+
+    # unique name: builds in other processes never share (or delete) it
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(db_path) + ".", suffix=".tmp", dir=os.path.dirname(db_path) or "."
+    )
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_path)
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            "INSERT INTO restaurants_fts (rowid, name, cuisines, locality, address) VALUES (?, ?, ?, ?, ?)",
+            zip(range(len(df)), *(df[col].astype(str).tolist() for col, _ in SEARCH_FIELDS.values()))
+        )
+        conn.executemany(
+            "INSERT INTO restaurant_city VALUES (?, ?)",
+            zip(range(len(df)), df['City'].astype(str).str.strip().str.lower().tolist())
+        )
+        conn.execute("INSERT INTO restaurants_fts (restaurants_fts) VALUES ('optimize')")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("signature", signature),
+            ("rows", str(len(df))),
+            ("built_at", time.strftime("%Y-%m-%d %H:%M:%S")),
+        ])
+        conn.commit()
+        conn.close()
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    print(f"Search index built: {len(df)} restaurants in {time.perf_counter() - start:.2f}s")
+    return signature
+
+
+def ensure_search_index(data_path="data/Dataset.csv", db_path=SEARCH_DB_PATH, signature=None):
+    """
+    Make the index match `signature`, the dataset version whose row ids the
+    caller resolves hits against (default: the file as it is now), rebuilding
+    it if needed. Returns True when it matches; False when the file has
+    already moved on from `signature`, so no index can be built for it
+    (the caller's model has not reloaded yet).
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    wanted = signature or dataset_signature(data_path)
+    if index_signature(db_path) == wanted:
+        return True
+    with _build_lock:
+        # another thread may have rebuilt it while this one waited
+        if index_signature(db_path) == wanted:
+            return True
+        if dataset_signature(data_path) != wanted:
+            return False
+        return build_search_index(data_path, db_path) == wanted
+
+
+# ---------- SEARCH ----------
+def build_match(query, fields=None, match_all=True, prefix=True):
+    """
+    Turn free text into a safe FTS5 MATCH expression: each word becomes a
+    quoted term (so user punctuation is never FTS syntax), optionally a
+    prefix term, AND-ed (or OR-ed) and restricted to `fields`.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    expr = (" AND " if match_all else " OR ").join(
+        f'"{t}"*' if prefix else f'"{t}"' for t in terms
+    )
+    if fields:
+        unknown = set(fields) - set(SEARCH_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown search fields: {sorted(unknown)}")
+        expr = "{" + " ".join(fields) + "} : (" + expr + ")"
+    return expr
+
+
+def search_restaurants(query, city=None, limit=20, fields=None, match_all=True,
+                       prefix=True, db_path=SEARCH_DB_PATH):
+    """
+    Ranked full-text search. Returns [(row_id, score)], best first; row_id
+    is the dataset row position and score = -bm25 (higher is better).
+    `city` filters on the exact (case-insensitive) city name.
+    """
+    expr = build_match(query, fields, match_all, prefix)
+    if expr is None:
+        return []
+
+    weights = ", ".join(str(w) for _, w in SEARCH_FIELDS.values())
+    sql = f"""
+        SELECT rowid, -bm25(restaurants_fts, {weights}) AS score
+        FROM restaurants_fts
+        WHERE restaurants_fts MATCH ?
+    """
+    params = [expr]
+    if city:
+        # unary + keeps SQLite from pushing the rowid list into the FTS scan
+        # (one FTS probe per city row); it filters the matches instead
+        sql += " AND +rowid IN (SELECT row_id FROM restaurant_city WHERE city_clean = ?)"
+        params.append(city.strip().lower())
+    sql += " ORDER BY score DESC, rowid LIMIT ?"
+    params.append(int(limit))
+
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    conn.close()
+    return rows
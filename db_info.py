@@ -1,6 +1,13 @@
+import argparse
+import ast
+import os
 import sqlite3
 
-def show_db_structure(db_path="database/foodquest.db"):
+DB_PATH = "database/foodquest.db"
+# Queries in this module are the ones the app runs; their plans are checked
+QUERY_SOURCE = "database/db.py"
+
+def show_db_structure(db_path=DB_PATH):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
@@ -44,7 +51,167 @@ def show_db_structure(db_path="database/foodquest.db"):
             print("\n  🔗 Foreign Keys: None")
 
     conn.close()
-    print("\nDone.\n")
+
+# ---------- SIZES & INDEXES ----------
+def query_dbstat(conn, sql):
+    # dbstat is a compile-time option (SQLITE_ENABLE_DBSTAT_VTAB); None without it
+    try:
+        return conn.execute(sql).fetchall()
+    except sqlite3.OperationalError:
+        return None
+
+
+def show_table_sizes(conn):
+    print("\n📌 TABLE SIZES\n")
+    # on-disk bytes per table / index, from the dbstat virtual table
+    sizes = query_dbstat(conn, "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+    if sizes is None:
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        print(f"     per-table sizes unavailable: this SQLite has no dbstat "
+              f"(whole file: {pages} pages, {pages * page_size / 1024:.1f} KB)")
+    known = sizes is not None
+    sizes = dict(sizes or [])
+    tables = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+    print(f"     {'table':<28}{'rows':>10}{'table KB':>10}{'index KB':>10}")
+    for table in tables:
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        indexes = [r[1] for r in conn.execute(f'PRAGMA index_list("{table}")')]
+        index_bytes = sum(sizes.get(i, 0) for i in indexes)
+        if not known:
+            print(f"     {table:<28}{rows:>10}{'n/a':>10}{'n/a':>10}")
+            continue
+        print(f"     {table:<28}{rows:>10}{sizes.get(table, 0) / 1024:>10.1f}{index_bytes / 1024:>10.1f}")
+
+
+def show_indexes(conn):
+    print("\n📌 INDEXES\n")
+    rows = conn.execute(
+        "SELECT name, tbl_name FROM sqlite_master WHERE type='index' ORDER BY tbl_name, name"
+    ).fetchall()
+    if not rows:
+        print("     (none)")
+    for name, table in rows:
+        columns = [r[2] for r in conn.execute(f'PRAGMA index_info("{name}")')]
+        auto = "  (automatic)" if name.startswith("sqlite_autoindex") else ""
+        print(f"     - {name} ON {table} ({', '.join(columns)}){auto}")
+
+
+# ---------- QUERY PLANS ----------
+def find_queries(source=QUERY_SOURCE):
+    """
+    Every literal SQL string passed to .execute() in `source`, as
+    (function name, sql). Read from the code, so new queries are
+    checked without touching this file. DDL (CREATE ...) is skipped.
+    """
+    with open(source, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    queries = []
+    for func in ast.walk(tree):
+        if not isinstance(func, ast.FunctionDef):
+            continue
+        for node in ast.walk(func):
+            if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                    and node.func.attr == "execute" and node.args
+                    and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+                sql = " ".join(node.args[0].value.split())
+                if not sql.upper().startswith("CREATE"):
+                    queries.append((func.name, sql))
+    return queries
+
+
+def explain(conn, sql):
+    # parameters bound as NULL: the plan only depends on the statement shape
+    return conn.execute("EXPLAIN QUERY PLAN " + sql, (None,) * sql.count("?")).fetchall()
+
+
+def show_query_plans(conn, source=QUERY_SOURCE):
+    print(f"\n📌 QUERY PLANS ({source})\n")
+    flagged = 0
+    for func, sql in find_queries(source):
+        try:
+            plan = explain(conn, sql)
+        except sqlite3.Error as e:
+            print(f"  {func}: {sql}\n     ❓ could not explain: {e}\n")
+            continue
+        scans = [d for *_, d in plan if d.startswith("SCAN")]
+        flagged += bool(scans)
+        print(f"  {'⚠️ ' if scans else '✅'} {func}: {sql}")
+        for *_, detail in plan:
+            note = "   <- full scan" if detail.startswith("SCAN") else ""
+            note = note or ("   <- extra sort" if "TEMP B-TREE" in detail else "")
+            print(f"       {detail}{note}")
+        print()
+    print(f"  {flagged} quer{'y' if flagged == 1 else 'ies'} with a full scan")
+
+
+# ---------- STORAGE ----------
+def show_storage_stats(conn, db_path=DB_PATH):
+    print("\n📌 STORAGE\n")
+    pragma = lambda name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+    page_size, page_count, freelist = pragma("page_size"), pragma("page_count"), pragma("freelist_count")
+    wal_path = db_path + "-wal"
+    wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    # bytes allocated in pages but holding no data (half-empty pages after deletes)
+    usage = query_dbstat(conn, "SELECT SUM(pgsize - unused), SUM(unused) FROM dbstat")
+
+    print(f"     file size       : {os.path.getsize(db_path) / 1024:.1f} KB")
+    print(f"     journal mode    : {pragma('journal_mode')}")
+    print(f"     WAL file        : {wal_size / 1024:.1f} KB")
+    print(f"     page size       : {page_size} B, {page_count} pages")
+    print(f"     free pages      : {freelist} ({freelist / max(page_count, 1):.1%} of the file)")
+    if usage is None:
+        print("     unused in pages : unavailable (this SQLite has no dbstat)")
+    else:
+        used, unused = usage[0]
+        print(f"     unused in pages : {(unused or 0) / 1024:.1f} KB "
+              f"({(unused or 0) / max((used or 0) + (unused or 0), 1):.1%} of allocated page space)")
+    if freelist / max(page_count, 1) > 0.2:
+        print("     ⚠️ over 20% of the file is free pages: run with --vacuum")
+
+
+# ---------- MAINTENANCE ----------
+def maintain(db_path=DB_PATH, analyze=False, vacuum=False):
+    conn = sqlite3.connect(db_path)
+    if analyze:
+        # refresh planner statistics (sqlite_stat1)
+        conn.execute("ANALYZE")
+        conn.commit()
+        print("ANALYZE done.")
+    if vacuum:
+        before = os.path.getsize(db_path)
+        conn.execute("VACUUM")
+        print(f"VACUUM done: {before / 1024:.1f} KB -> {os.path.getsize(db_path) / 1024:.1f} KB")
+    conn.close()
+
+
+def analyze_db(db_path=DB_PATH, source=QUERY_SOURCE):
+    show_db_structure(db_path)
+    conn = sqlite3.connect(db_path)
+    show_table_sizes(conn)
+    show_indexes(conn)
+    show_query_plans(conn, source)
+    show_storage_stats(conn, db_path)
+    conn.close()
+
 
 if __name__ == "__main__":
-    show_db_structure()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="FoodQuest database structure and performance report")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--source", default=QUERY_SOURCE, help="module whose queries get EXPLAIN QUERY PLAN")
+    parser.add_argument("--structure-only", action="store_true", help="only tables, columns and foreign keys")
+    parser.add_argument("--analyze", action="store_true", help="run ANALYZE before the report")
+    parser.add_argument("--vacuum", action="store_true", help="run VACUUM before the report")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+    if args.analyze or args.vacuum:
+        maintain(args.db, analyze=args.analyze, vacuum=args.vacuum)
+    if args.structure_only:
+        show_db_structure(args.db)
+    else:
+        analyze_db(args.db, args.source)
+    print("\nDone.\n")
\ No newline at end of file
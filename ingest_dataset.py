@@ -0,0 +1,17 @@
+import argparse
+
+from utils.ingest import CHUNK_SIZE, ingest_csv
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Stream a restaurant CSV into validated, typed Parquet (bad rows are quarantined)"
+    )
+    parser.add_argument("source", nargs="?", default="data/Dataset.csv")
+    parser.add_argument("--out", default="data/Dataset.parquet")
+    parser.add_argument("--quarantine", default=None, help="CSV for rejected rows (default: <out>.rejected.csv)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print("\n📌 INGESTING DATASET\n")
+    ingest_csv(args.source, args.out, args.quarantine, chunk_size=args.chunk_size)
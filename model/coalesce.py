@@ -0,0 +1,133 @@
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+    The first caller (leader) runs the function; callers arriving while it
+    is in flight wait for it and share its result or exception. Nothing is
+    cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_ratio": self.coalesced / self.calls if self.calls else 0.0,
+            }
+
+
+def _normalize(value, fold):
+    # "Delhi " and "delhi" are the same query, but only for the arguments
+    # the recommender itself case-folds; rank_by="Quality" must still fail
+    if fold and isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def _copy(result):
+    # callers may mutate their lists; never hand out the shared object
+    if isinstance(result, list):
+        return list(result)
+    if isinstance(result, tuple):
+        return tuple(_copy(r) for r in result)
+    return result
+
+
+class CoalescingRecommender:
+    """
+    Wraps a FoodRecommender so identical concurrent read queries share one
+    computation. Everything else (writes, attributes) passes straight
+    through to the wrapped model.
+    """
+
+    COALESCED = ('recommend', 'recommend_by_preferences', 'recommend_by_text')
+
+    # leading parameters of each method that FoodRecommender case-folds
+    FOLDED = {
+        'recommend': ('restaurant_name', 'city_name'),
+        'recommend_by_preferences': ('cuisine', 'city'),
+        'recommend_by_text': ('query', 'city'),
+    }
+
+    def __init__(self, model):
+        self.model = model
+        self.flight = SingleFlight()
+
+    def _call(self, method, *args, **kwargs):
+        folded = self.FOLDED[method]
+        key = (
+            method,
+            tuple(_normalize(a, i < len(folded)) for i, a in enumerate(args)),
+            tuple(sorted((k, _normalize(v, k in folded)) for k, v in kwargs.items())),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return getattr(self.model, method)(*args, **kwargs)
+        return _copy(self.flight.do(key, getattr(self.model, method), *args, **kwargs))
+
+    def recommend(self, *args, **kwargs):
+        return self._call('recommend', *args, **kwargs)
+
+    def recommend_by_preferences(self, *args, **kwargs):
+        return self._call('recommend_by_preferences', *args, **kwargs)
+
+    def recommend_by_text(self, *args, **kwargs):
+        return self._call('recommend_by_text', *args, **kwargs)
+
+    def stats(self):
+        return self.flight.stats()
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
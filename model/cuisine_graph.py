@@ -0,0 +1,85 @@
+from functools import lru_cache
+
+import numpy as np
+import scipy.sparse as sp
+
+# Strongest adjacent cuisines kept per cuisine
+GRAPH_NEIGHBORS = 10
+
+
+def split_cuisines(value):
+    return [c.strip().lower() for c in str(value).split(',') if c.strip()]
+
+
+class CuisineGraph:
+    """
+    Cuisine co-occurrence graph of one dataset version. Two cuisines are
+    adjacent when restaurants serve them together; the edge a -> b is
+    weighted P(b | a) = restaurants serving both / restaurants serving a.
+    Everything is precomputed, so suggest() is lookups plus a small sum.
+    """
+
+    def __init__(self, df, n_neighbors=GRAPH_NEIGHBORS):
+        lists = [split_cuisines(v) for v in df['Cuisines']]
+        self.names = sorted({c for cs in lists for c in cs})
+        self.ids = {c: i for i, c in enumerate(self.names)}
+
+        # restaurant x cuisine incidence matrix (0/1)
+        indptr = np.cumsum([0] + [len(cs) for cs in lists])
+        indices = np.array([self.ids[c] for cs in lists for c in cs], dtype=np.int64)
+        incidence = sp.csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(len(lists), len(self.names))
+        )
+        incidence.sum_duplicates()
+        incidence.data[:] = 1.0
+        self.counts = np.asarray(incidence.sum(axis=0)).ravel()
+
+        # cuisine x cuisine co-occurrence counts, self-loops dropped
+        cooc = (incidence.T @ incidence).tocsr()
+        cooc.setdiag(0)
+        cooc.eliminate_zeros()
+
+        # per cuisine: (adjacent ids, P(b | a)), strongest first
+        self.adjacent = []
+        for a in range(len(self.names)):
+            span = slice(cooc.indptr[a], cooc.indptr[a + 1])
+            ids, weights = cooc.indices[span], cooc.data[span] / self.counts[a]
+            order = np.lexsort((ids, -weights))[:n_neighbors]
+            self.adjacent.append((ids[order], weights[order]))
+
+        # cuisine -> restaurant rows (sorted), clean name -> cuisines of any branch
+        by_cuisine = incidence.tocsc()
+        self.rows = [
+            by_cuisine.indices[by_cuisine.indptr[i]:by_cuisine.indptr[i + 1]]
+            for i in range(len(self.names))
+        ]
+        self.by_name = {}
+        for name, cs in zip(df['Restaurant Name Clean'], lists):
+            self.by_name.setdefault(name, set()).update(self.ids[c] for c in cs)
+
+        # one ranking per distinct set of tried cuisines
+        self.suggest = lru_cache(maxsize=4096)(self._suggest)
+
+    def cuisines_of(self, restaurant_names):
+        """Cuisine ids served by the named restaurants (display or clean names)."""
+        tried = set()
+        for name in restaurant_names:
+            tried |= self.by_name.get(name.strip().lower(), set())
+        return frozenset(tried)
+
+    def _suggest(self, tried):
+        """
+        tried: frozenset of cuisine ids. Returns ((cuisine, score, because), ...)
+        for untried cuisines, best first; score sums P(b | a) over tried a.
+        """
+        scores = {}
+        because = {}
+        for a in tried:
+            ids, weights = self.adjacent[a]
+            for b, w in zip(ids.tolist(), weights.tolist()):
+                if b in tried:
+                    continue
+                scores[b] = scores.get(b, 0.0) + w
+                because.setdefault(b, []).append(self.names[a])
+        ranked = sorted(scores, key=lambda b: (-scores[b], b))
+        return tuple((self.names[b], scores[b], tuple(sorted(because[b]))) for b in ranked)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+# Every cost is compared in this currency
+BASE_CURRENCY = "INR"
+
+# Units of BASE_CURRENCY per unit of each "Currency" value in the dataset.
+# Static and local on purpose (no network at load time); refresh by hand.
+RATES_TO_INR = {
+    "Indian Rupees(Rs.)": 1.0,
+    "Dollar($)": 83.0,
+    "Pounds(£)": 105.0,
+    "Emirati Diram(AED)": 22.6,
+    "Qatari Rial(QR)": 22.8,
+    "Brazilian Real(R$)": 16.5,
+    "Rand(R)": 4.5,
+    "NewZealand($)": 50.0,
+    "Turkish Lira(TL)": 2.6,
+    "Indonesian Rupiah(IDR)": 0.0053,
+    "Sri Lankan Rupee(LKR)": 0.27,
+    "Botswana Pula(P)": 6.1,
+}
+
+
+def clean_cost(df):
+    """
+    "Average Cost for two" converted to BASE_CURRENCY. NaN for an unknown
+    currency or a missing / zero cost, so budget filters skip the row.
+    """
+    cost = pd.to_numeric(df['Average Cost for two'], errors='coerce').to_numpy(dtype=float)
+    rate = df['Currency'].astype(str).str.strip().map(RATES_TO_INR).to_numpy(dtype=float)
+    cost = cost * rate
+    cost[~(cost > 0)] = np.nan
+    return cost
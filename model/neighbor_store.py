@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import time
+
+# Serving only needs sqlite3; the build imports the heavy stack lazily so
+# web workers that just read the table start without pandas/scikit-learn.
+NEIGHBOR_DB_PATH = "database/neighbors.db"
+
+SCHEMA = """
+CREATE TABLE restaurants (
+    row_id INTEGER PRIMARY KEY,
+    restaurant_id INTEGER,
+    name TEXT,
+    name_clean TEXT,
+    cuisines TEXT,
+    city TEXT,
+    city_clean TEXT,
+    latitude REAL,
+    longitude REAL,
+    address TEXT
+);
+CREATE INDEX idx_restaurants_city_name ON restaurants (city_clean, name_clean);
+CREATE TABLE neighbors (
+    row_id INTEGER,
+    rank INTEGER,
+    neighbor_id INTEGER,
+    score REAL,
+    PRIMARY KEY (row_id, rank)
+) WITHOUT ROWID;
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+NEIGHBORS_SQL = """
+    SELECT r.name, r.cuisines, r.city, n.score, r.latitude, r.longitude, r.address
+    FROM neighbors n JOIN restaurants r ON r.row_id = n.neighbor_id
+    WHERE n.row_id = ({base})
+    ORDER BY n.rank
+"""
+EXACT_BASE_SQL = "SELECT row_id FROM restaurants WHERE city_clean = ? AND name_clean = ? ORDER BY row_id LIMIT 1"
+CONTAINS_BASE_SQL = "SELECT row_id FROM restaurants WHERE city_clean = ? AND instr(name_clean, ?) > 0 ORDER BY row_id LIMIT 1"
+
+
+# ---------- OFFLINE BUILD ----------
+def _city_neighbors(rows, texts, names, k, engine):
+    # worker: featurize one city and return its top-K lists (global row ids),
+    # de-duplicated by display name exactly like FoodRecommender.recommend()
+    import numpy as np
+    import pandas as pd
+    from sklearn.preprocessing import normalize
+
+    from model.neighbors import make_engine
+    from model.recommender import make_vectorizer
+
+    matrix = normalize(make_vectorizer().transform(texts)).tocsr()
+    engine = make_engine(engine)
+    engine.fit(matrix)
+
+    codes = pd.factorize(names)[0]
+    # deep enough that k distinct names always survive de-duplication
+    depth = min(len(rows) - 1, k + len(rows) - (codes.max() + 1))
+    local = np.arange(len(rows))
+    idx, sims = engine.search(matrix, local, local, depth)
+
+    out_idx = np.full((len(rows), k), -1, dtype=np.int64)
+    out_sims = np.zeros((len(rows), k), dtype=np.float32)
+    for i in range(len(rows)):
+        found = idx[i][idx[i] >= 0]
+        _, first = np.unique(codes[found], return_index=True)
+        keep = np.sort(first)[:k]
+        out_idx[i, :len(keep)] = rows[found[keep]]
+        out_sims[i, :len(keep)] = sims[i, keep]
+    return rows, out_idx, out_sims
+
+
+def build_neighbor_db(data_path="data/Dataset.csv", db_path=NEIGHBOR_DB_PATH,
+                      k=50, workers=None, engine="exact", log=print):
+    """
+    Compute the top-K same-city neighbours of every restaurant with one
+    process-pool task per city and write them to an indexed SQLite file.
+    The file is built next to `db_path` and swapped in atomically.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    import numpy as np
+    import pandas as pd
+
+    from model.recommender import add_clean_columns
+    from utils.ingest import read_dataset
+
+    start = time.perf_counter()
+    df = add_clean_columns(read_dataset(data_path).fillna(''))
+    names = df['Restaurant Name'].str.strip().str.title().to_numpy()
+
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO restaurants VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        zip(
+            range(len(df)), df['Restaurant ID'].tolist(), df['Restaurant Name'].tolist(),
+            df['Restaurant Name Clean'].tolist(), df['Cuisines'].tolist(), df['City'].tolist(),
+            df['City Clean'].tolist(),
+            pd.to_numeric(df['Latitude'], errors='coerce').fillna(0.0).tolist(),
+            pd.to_numeric(df['Longitude'], errors='coerce').fillna(0.0).tolist(),
+            df['Address'].tolist(),
+        )
+    )
+
+    # biggest cities first so the pool stays busy
+    groups = sorted(df.groupby('City Clean').indices.items(), key=lambda kv: -len(kv[1]))
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_city_neighbors, np.asarray(rows), df['combined'].to_numpy()[rows], names[rows], k, engine)
+            for _, rows in groups if len(rows) > 1
+        ]
+        for fut in as_completed(futures):
+            rows, idx, sims = fut.result()
+            conn.executemany(
+                "INSERT INTO neighbors VALUES (?, ?, ?, ?)",
+                (
+                    (int(rows[i]), rank, int(idx[i, rank]), float(sims[i, rank]))
+                    for i in range(len(rows)) for rank in range(idx.shape[1]) if idx[i, rank] >= 0
+                )
+            )
+            done += len(rows)
+            log(f"  {done}/{len(df)} restaurants")
+
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ("k", str(k)),
+        ("engine", str(engine)),
+        ("source", os.path.abspath(data_path)),
+        ("built_at", time.strftime("%Y-%m-%d %H:%M:%S")),
+    ])
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, db_path)
+    log(f"Wrote {db_path} in {time.perf_counter() - start:.1f}s")
+
+
+# ---------- SERVING ----------
+class NeighborStore:
+    """Answers restaurant-based recommendations from a prebuilt neighbour DB."""
+
+    def __init__(self, db_path=NEIGHBOR_DB_PATH):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Neighbour DB not found: {db_path} (run build_neighbors.py)")
+        self.db_path = db_path
+
+    def get_connection(self):
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def recommend(self, restaurant_name, city_name, top_n=10):
+        rn = restaurant_name.strip().lower()
+        cn = city_name.strip().lower()
+
+        conn = self.get_connection()
+        cur = conn.cursor()
+        # exact name first, then contains within the city
+        cur.execute(NEIGHBORS_SQL.format(base=EXACT_BASE_SQL), (cn, rn))
+        rows = cur.fetchall()
+        if not rows:
+            cur.execute(NEIGHBORS_SQL.format(base=CONTAINS_BASE_SQL), (cn, rn))
+            rows = cur.fetchall()
+        conn.close()
+
+        results = []
+        seen = set()
+        for name, cuisines, city, score, lat, lon, address in rows:
+            name = name.strip().title()
+            if name in seen:
+                continue
+            seen.add(name)
+            results.append((name, cuisines, city.title(), round(score, 3), lat, lon, address))
+            if len(results) >= top_n:
+                break
+        return results
@@ -0,0 +1,264 @@
+import numpy as np
+
+# Rows scored per block by the exact engine
+EXACT_BLOCK = 256
+# Targets whose candidate pairs are generated together by the LSH engine
+LSH_BLOCK = 1024
+# Rows per copy-on-write block of a NeighborTable
+TABLE_BLOCK = 64
+
+
+def _empty_result(n_targets, k):
+    return (
+        np.full((n_targets, k), -1, dtype=np.int64),
+        np.full((n_targets, k), -np.inf, dtype=np.float32),
+    )
+
+
+def _top_k_pairs(target_pos, cand_rows, sims, n_targets, k):
+    # keep the k best (target, candidate) pairs per target, best first.
+    # Pairs arrive grouped by target and ordered by candidate.
+    idx, out = _empty_result(n_targets, k)
+    if len(sims) == 0:
+        return idx, out
+    order = np.argsort(-sims, kind='stable')
+    order = order[np.argsort(target_pos[order], kind='stable')]
+    target_pos, cand_rows, sims = target_pos[order], cand_rows[order], sims[order]
+    group_start = np.r_[0, np.flatnonzero(np.diff(target_pos)) + 1]
+    rank = np.arange(len(target_pos)) - np.repeat(group_start, np.diff(np.r_[group_start, len(target_pos)]))
+    keep = rank < k
+    idx[target_pos[keep], rank[keep]] = cand_rows[keep]
+    out[target_pos[keep], rank[keep]] = sims[keep]
+    return idx, out
+
+
+class NeighborTable:
+    """
+    Top-K neighbour lists (row ids, similarities) of every row, held in
+    blocks of TABLE_BLOCK rows. Model versions share blocks: a writer's
+    copy() copies the block list, and a block only when one of its rows is
+    written, so a write costs O(rows changed), not O(n * K).
+    """
+
+    def __init__(self, idx, sims, block=TABLE_BLOCK):
+        self.k = idx.shape[1]
+        self.block = block
+        self.n = len(idx)
+        self.blocks = [(idx[s:s + block], sims[s:s + block]) for s in range(0, len(idx), block)]
+        self.owned = set()   # blocks this copy may write in place
+
+    def copy(self):
+        table = NeighborTable.__new__(NeighborTable)
+        table.k, table.block, table.n = self.k, self.block, self.n
+        table.blocks = list(self.blocks)
+        table.owned = set()
+        return table
+
+    def get(self, row):
+        idx, sims = self.blocks[row // self.block]
+        return idx[row % self.block], sims[row % self.block]
+
+    def _groups(self, rows):
+        # (block number, positions in `rows`) per block touched
+        blocks = rows // self.block
+        order = np.argsort(blocks, kind='stable')
+        starts = np.r_[0, np.flatnonzero(np.diff(blocks[order])) + 1]
+        for group in np.split(order, starts[1:]):
+            if len(group):
+                yield int(blocks[group[0]]), group
+
+    def take(self, rows):
+        """Lists of many rows at once, as two (len(rows), K) arrays."""
+        rows = np.asarray(rows, dtype=np.int64)
+        idx, sims = _empty_result(len(rows), self.k)
+        for b, group in self._groups(rows):
+            block_idx, block_sims = self.blocks[b]
+            idx[group] = block_idx[rows[group] % self.block]
+            sims[group] = block_sims[rows[group] % self.block]
+        return idx, sims
+
+    def set(self, rows, idx, sims):
+        rows = np.asarray(rows, dtype=np.int64)
+        for b, group in self._groups(rows):
+            if b not in self.owned:
+                block_idx, block_sims = self.blocks[b]
+                self.blocks[b] = (block_idx.copy(), block_sims.copy())
+                self.owned.add(b)
+            block_idx, block_sims = self.blocks[b]
+            block_idx[rows[group] % self.block] = idx[group]
+            block_sims[rows[group] % self.block] = sims[group]
+
+    def grow(self, n):
+        """Add empty lists (-1 / -inf) up to n rows."""
+        if n <= self.n:
+            return
+        last = len(self.blocks) - 1
+        if self.blocks and len(self.blocks[-1][0]) < self.block:
+            # fill the partial last block first
+            idx, sims = self.blocks[last]
+            extra = min(self.block - len(idx), n - self.n)
+            pad_idx, pad_sims = _empty_result(extra, self.k)
+            self.blocks[last] = (np.vstack([idx, pad_idx]), np.vstack([sims, pad_sims]))
+            self.owned.add(last)
+            self.n += extra
+        while self.n < n:
+            size = min(self.block, n - self.n)
+            self.blocks.append(_empty_result(size, self.k))
+            self.owned.add(len(self.blocks) - 1)
+            self.n += size
+
+    def freeze(self):
+        for b in self.owned:
+            for arr in self.blocks[b]:
+                arr.flags.writeable = False
+        self.owned = set()
+        return self
+
+    def arrays(self):
+        """The whole table as two (n, K) arrays (a copy)."""
+        if not self.blocks:
+            return _empty_result(0, self.k)
+        return np.vstack([b[0] for b in self.blocks]), np.vstack([b[1] for b in self.blocks])
+
+
+class ExactEngine:
+    """Brute-force cosine top-K over every same-city row."""
+
+    def fit(self, matrix):
+        pass
+
+    def add(self, features):
+        pass
+
+    @staticmethod
+    def _top_columns(sims, k):
+        # columns of the k best scores per row, in column order. argpartition
+        # alone keeps an arbitrary subset of the scores tied at the k-th
+        # place; here ties at the cut-off go to the earliest columns.
+        kth = -np.partition(-sims, k - 1, axis=1)[:, k - 1:k]
+        above = sims > kth
+        tied = sims == kth
+        need = k - above.sum(axis=1, keepdims=True)
+        keep = above | (tied & (np.cumsum(tied, axis=1) <= need))
+        return np.nonzero(keep)[1].reshape(len(sims), k)
+
+    def search(self, matrix, rows, targets, k):
+        idx, out = _empty_result(len(targets), k)
+        k = min(k, len(rows) - 1)
+        if k <= 0:
+            return idx, out
+        city_matrix = matrix[rows].T.tocsc()
+        for start in range(0, len(targets), EXACT_BLOCK):
+            block = targets[start:start + EXACT_BLOCK]
+            # ranked at the stored float32 precision: scores equal up to float64
+            # rounding noise are ties, and ties keep dataset order
+            sims = (matrix[block] @ city_matrix).toarray().astype(np.float32)
+            sims[rows[None, :] == block[:, None]] = -np.inf   # never your own neighbour
+            top = self._top_columns(sims, k)
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            # best first, ties keep dataset order
+            order = np.argsort(-top_sims, axis=1, kind='stable')
+            idx[start:start + len(block), :k] = rows[np.take_along_axis(top, order, axis=1)]
+            out[start:start + len(block), :k] = np.take_along_axis(top_sims, order, axis=1)
+        return idx, out
+
+
+class LSHEngine:
+    """
+    Random-hyperplane LSH. Each row gets `n_tables` bucket keys of `n_bits`
+    sign bits; candidates are rows sharing a bucket in any table (at most
+    `max_bucket` per table), re-scored exactly.
+
+    More tables -> higher recall, slower. More bits -> smaller buckets,
+    faster, lower recall. The default 16 x 8 reaches recall@10 of about
+    0.88 on the bundled dataset; 8 x 10 builds ~3x faster at about 0.64.
+    """
+
+    def __init__(self, n_tables=16, n_bits=8, max_bucket=200, seed=0):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.max_bucket = max_bucket
+        self.seed = seed
+        self.keys = np.empty((0, n_tables), dtype=np.int64)
+
+    def _planes(self, cols):
+        # +-1 hyperplane entries hashed from (column, plane): no dense F x P matrix
+        planes = np.arange(self.n_tables * self.n_bits, dtype=np.uint64) + np.uint64(self.seed) * np.uint64(7919)
+        with np.errstate(over='ignore'):
+            x = cols.astype(np.uint64)[:, None] * np.uint64(0x9E3779B97F4A7C15) + planes * np.uint64(0xBF58476D1CE4E5B9)
+            x ^= x >> np.uint64(31)
+            x *= np.uint64(0x94D049BB133111EB)
+            x ^= x >> np.uint64(29)
+        return np.where(x & np.uint64(1), 1.0, -1.0)
+
+    def _signatures(self, features):
+        cols = np.unique(features.indices)
+        bits = (features[:, cols] @ self._planes(cols)) > 0
+        bits = bits.reshape(features.shape[0], self.n_tables, self.n_bits)
+        return (bits * (1 << np.arange(self.n_bits, dtype=np.int64))).sum(axis=2)
+
+    def fit(self, matrix):
+        self.keys = self._signatures(matrix)
+
+    def add(self, features):
+        self.keys = np.vstack([self.keys, self._signatures(features)])
+
+    def search(self, matrix, rows, targets, k):
+        idx, out = _empty_result(len(targets), k)
+        if len(rows) < 2:
+            return idx, out
+        # per-table bucket order of the city's rows
+        tables = []
+        for t in range(self.n_tables):
+            order = np.argsort(self.keys[rows, t], kind='stable')
+            inverse = np.empty_like(order)
+            inverse[order] = np.arange(len(order))
+            tables.append((order, self.keys[rows[order], t], inverse))
+
+        for start in range(0, len(targets), LSH_BLOCK):
+            block = targets[start:start + LSH_BLOCK]
+            block_idx, block_sims = self._search_block(matrix, rows, block, tables, k)
+            idx[start:start + len(block)] = block_idx
+            out[start:start + len(block)] = block_sims
+        return idx, out
+
+    def _search_block(self, matrix, rows, targets, tables, k):
+        # position of each target inside the city's row list
+        target_local = np.searchsorted(rows, targets)
+        pairs = []
+        for t, (order, sorted_keys, inverse) in enumerate(tables):
+            tkeys = self.keys[targets, t]
+            lo = np.searchsorted(sorted_keys, tkeys, 'left')
+            hi = np.searchsorted(sorted_keys, tkeys, 'right')
+            # oversized buckets: a window of max_bucket rows around the target
+            cnt = np.minimum(hi - lo, self.max_bucket)
+            first = np.clip(inverse[target_local] - cnt // 2, lo, hi - cnt)
+            offsets = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            cand = order[np.repeat(first, cnt) + offsets]
+            pairs.append(np.repeat(np.arange(len(targets)), cnt) * len(rows) + cand)
+
+        # de-duplicate across tables (sort-based) and drop self pairs
+        pairs = np.concatenate(pairs)
+        pairs.sort()
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+        pair_t, pair_c = pairs // len(rows), pairs % len(rows)
+        keep = pair_c != target_local[pair_t]
+        pair_t, pair_c = pair_t[keep], rows[pair_c[keep]]
+
+        sims = np.asarray(matrix[targets[pair_t]].multiply(matrix[pair_c]).sum(axis=1)).ravel().astype(np.float32)
+        return _top_k_pairs(pair_t, pair_c, sims, len(targets), k)
+
+
+ENGINES = {
+    "exact": ExactEngine,
+    "lsh": LSHEngine,
+}
+
+
+def make_engine(engine):
+    # accept an engine instance or a registered name
+    if engine is None:
+        return ExactEngine()
+    if isinstance(engine, str):
+        return ENGINES[engine]()
+    return engine
@@ -1,41 +1,521 @@
+import threading
+
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from model.cuisine_graph import CuisineGraph
+from model.currency import clean_cost
+from model.neighbors import NeighborTable, make_engine
+from utils.ingest import dataset_signature, read_dataset
+
+# Same-city neighbours precomputed per restaurant
+N_NEIGHBORS = 50
+
+# Relaxation ladder of recommend_by_preferences, strictest first
+PREFERENCE_TIERS = [
+    "all filters",
+    "price relaxed",
+    "price and cuisine relaxed",
+    "city only",
+    "all restaurants",
+]
+
+# Votes after which a restaurant's own rating outweighs its city's prior
+QUALITY_PRIOR_VOTES = 50
+# Orderings offered by recommend_by_preferences(rank_by=...)
+RANKINGS = ("similarity", "quality", "blend")
+# Diversified results are picked from the top (factor x top_n) candidates
+MMR_POOL_FACTOR = 5
+
+def add_clean_columns(df):
+    # create clean columns for robust matching
+    df['Restaurant Name Clean'] = df['Restaurant Name'].astype(str).str.strip().str.lower()
+    df['City Clean'] = df['City'].astype(str).str.strip().str.lower()
+    # Combined features for similarity
+    df['combined'] = (
+        df['Cuisines'].astype(str) + ' ' +
+        df['Restaurant Name'].astype(str) + ' ' +
+        df['City'].astype(str)
+    )
+    return df
+
+
+def make_vectorizer():
+    # Hashing featurizer is stateless, so new rows never force a refit
+    return HashingVectorizer(stop_words='english', alternate_sign=False, norm=None)
+
+
+def clean_price(df):
+    # "Price range" as float, NaN where it can't be parsed
+    return np.trunc(pd.to_numeric(df['Price range'], errors='coerce').to_numpy(dtype=float))
+
+
+def clean_rating(df):
+    # "Aggregate rating" as float, 0.0 where it can't be parsed
+    return pd.to_numeric(df['Aggregate rating'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+
+
+def clean_votes(df):
+    return pd.to_numeric(df['Votes'], errors='coerce').fillna(0.0).clip(lower=0).to_numpy(dtype=float)
+
+
+def quality_priors(rating, votes, cities, m=QUALITY_PRIOR_VOTES):
+    """
+    Vote-weighted mean rating per city, itself shrunk towards the global
+    mean so a city with few votes gets no extreme prior.
+    Returns ({city: prior}, global prior).
+    """
+    weight = np.where(rating > 0, votes, 0.0)   # 0.0 = "Not rated"
+    global_prior = float((weight * rating).sum() / max(weight.sum(), 1.0))
+    sums = pd.DataFrame({'city': cities, 'wr': weight * rating, 'w': weight}).groupby('city').sum()
+    priors = (sums['wr'] + m * global_prior) / (sums['w'] + m)
+    return priors.to_dict(), global_prior
+
+
+def quality_score(rating, votes, prior, m=QUALITY_PRIOR_VOTES):
+    # Bayesian average: a few votes stay near the prior, many reach the own rating
+    votes = np.where(rating > 0, votes, 0.0)
+    return (votes * rating + m * prior) / (votes + m)
+
+
+def _iter_ranked(rows, scores, window=64):
+    """
+    Yield (row, score) best first, ties in row order, sorting only as deep
+    as the caller actually reads (top windows grow 4x on demand).
+    """
+    remaining = np.arange(len(rows))
+    while len(remaining):
+        sc = scores[remaining]
+        if len(remaining) > window:
+            cut = np.partition(sc, len(sc) - window)[len(sc) - window]
+            take = sc >= cut   # keeps every tie at the cut
+        else:
+            take = np.ones(len(sc), dtype=bool)
+        chunk = remaining[take]
+        for i in chunk[np.lexsort((rows[chunk], -scores[chunk]))]:
+            yield rows[i], float(scores[i])
+        remaining = remaining[~take]
+        window *= 4
+
+
+def _freeze(arr):
+    arr.flags.writeable = False
+    return arr
+
+
+def _sorted_index(values):
+    # stable argsort (ties in row order, NaN last) and the sorted values
+    order = np.argsort(values, kind='stable')
+    return order, values[order]
+
+
+def _update_sorted_index(order, ordered, old, new, rows):
+    """
+    _sorted_index(new) from _sorted_index(old) when only `rows` changed
+    (rows >= len(old) are new): each row is found by binary search, taken
+    out and put back at its new place. O(len(rows) * log n) plus a memmove.
+    """
+    def locate(ordered, order, value, row):
+        # (value, row) order: the row's place among the entries equal to value
+        lo = np.searchsorted(ordered, value, 'left')
+        hi = np.searchsorted(ordered, value, 'right')
+        return lo + np.searchsorted(order[lo:hi], row)
+
+    rows = np.unique(rows)
+    old_rows = rows[rows < len(old)]
+    drop = [locate(ordered, order, old[r], r) for r in old_rows]
+    order, ordered = np.delete(order, drop), np.delete(ordered, drop)
+
+    values = new[rows]
+    by_key = np.lexsort((rows, values))   # NaN last, like argsort
+    rows, values = rows[by_key], values[by_key]
+    at = [locate(ordered, order, v, r) for v, r in zip(values, rows)]
+    return np.insert(order, at, rows), np.insert(ordered, at, values)
+
+
+class ModelState:
+    """
+    One published version of the model. Readers grab `recommender.state`
+    once per call and never see it change; writers build a draft and swap
+    the reference, so reads need no lock.
+
+    A draft shares every field with the version it came from. A writer
+    calls own() before changing a field in place, or replaces it; neighbour
+    lists are shared block by block. freeze() then updates the read-side
+    indexes for the rows in `touched` only.
+    """
+    __slots__ = (
+        'df', 'feature_matrix', 'feature_sum', 'active', 'city_rows', 'neighbors',
+        'price', 'rating', 'cost', 'quality',
+        'cuisine_codes', 'cuisine_values', 'cuisine_lookup',
+        # derived per published version by freeze()
+        'mean_sim', 'price_order', 'price_sorted', 'rating_order', 'rating_sorted',
+        'cost_order', 'cost_sorted',
+        # writer bookkeeping, cleared by freeze()
+        'parent', 'owned', 'touched',
+    )
+    FIELDS = ('df', 'feature_matrix', 'feature_sum', 'active', 'price', 'rating', 'cost', 'quality',
+              'cuisine_codes', 'cuisine_values', 'cuisine_lookup')
+    SORTED = ('price', 'rating', 'cost')
+
+    def __init__(self, **fields):
+        self.parent = None
+        self.owned = set()
+        self.touched = []
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def draft(self):
+        # a writer's copy; the sparse matrix and the city row arrays are only ever replaced
+        draft = ModelState(**{name: getattr(self, name) for name in self.FIELDS})
+        draft.city_rows = dict(self.city_rows)
+        draft.neighbors = self.neighbors.copy()
+        draft.parent = self
+        return draft
+
+    def own(self, *names):
+        # private, writable copy of each field, made once per draft
+        for name in names:
+            if name not in self.owned:
+                setattr(self, name, getattr(self, name).copy())
+                self.owned.add(name)
+
+    def touch(self, rows):
+        # rows whose price / rating / cost may have changed (or are new)
+        self.touched.extend(np.atleast_1d(rows).tolist())
+
+    def freeze(self):
+        # read-side indexes, updated once per published version
+        parent = self.parent
+        if parent is None or self.feature_sum is not parent.feature_sum or self.active is not parent.active:
+            n = max(int(self.active.sum()), 1)
+            self.mean_sim = self.feature_matrix @ self.feature_sum / n
+        else:
+            self.mean_sim = parent.mean_sim   # features untouched: every mean similarity stands
+        for name in self.SORTED:
+            values = getattr(self, name)
+            if parent is None or len(self.touched) * 16 > len(values):
+                order, ordered = _sorted_index(values)   # NaN sorts last
+            elif values is getattr(parent, name):
+                order, ordered = getattr(parent, name + '_order'), getattr(parent, name + '_sorted')
+            else:
+                order, ordered = _update_sorted_index(
+                    getattr(parent, name + '_order'), getattr(parent, name + '_sorted'),
+                    getattr(parent, name), values, np.asarray(self.touched, dtype=np.int64)
+                )
+            setattr(self, name + '_order', order)
+            setattr(self, name + '_sorted', ordered)
+
+        for name in ('feature_sum', 'active', 'price', 'rating', 'cost', 'quality', 'cuisine_codes',
+                     'mean_sim', 'price_order', 'price_sorted', 'rating_order', 'rating_sorted',
+                     'cost_order', 'cost_sorted'):
+            _freeze(getattr(self, name))
+        for rows in self.city_rows.values():
+            _freeze(rows)
+        self.neighbors.freeze()
+        # canonical CSR up front so no read ever needs to sort it in place
+        self.feature_matrix.sum_duplicates()
+        for arr in (self.feature_matrix.data, self.feature_matrix.indices, self.feature_matrix.indptr):
+            _freeze(arr)
+        # let the previous version go once no reader holds it
+        self.parent = None
+        self.owned = set()
+        self.touched = []
+        return self
+
 
 class FoodRecommender:
-    def __init__(self, data_path):
-        # Load dataset
-        self.df = pd.read_csv(data_path).fillna('')
-        # create clean columns for robust matching
-        self.df['Restaurant Name Clean'] = self.df['Restaurant Name'].astype(str).str.strip().str.lower()
-        self.df['City Clean'] = self.df['City'].astype(str).str.strip().str.lower()
-        # Combined features for similarity
-        self.df['combined'] = (
-            self.df['Cuisines'].astype(str) + ' ' +
-            self.df['Restaurant Name'].astype(str) + ' ' +
-            self.df['City'].astype(str)
+    # Set by from_neighbor_db(): recommend() is then answered from SQLite
+    store = None
+
+    def __init__(self, data_path, n_neighbors=N_NEIGHBORS, engine=None):
+        # Load dataset; every derived column is computed here, never on the read path
+        # (CSV, or the typed Parquet written by ingest_dataset.py)
+        # The version read, taken first: a change while reading counts as a newer version
+        self.data_signature = dataset_signature(data_path)
+        df = read_dataset(data_path).fillna('')
+        self.source_columns = list(df.columns)
+        add_clean_columns(df)
+        # Rows are L2-normalised: cosine similarity is a plain dot product
+        self.vectorizer = make_vectorizer()
+        feature_matrix = normalize(self.vectorizer.transform(df['combined'])).tocsr()
+
+        # `engine` builds the neighbour lists: "exact" (default), "lsh" or an instance
+        self.engine = make_engine(engine)
+        self.engine.fit(feature_matrix)
+        self.n_neighbors = n_neighbors
+        # serialises writers; readers never take it
+        self._write_lock = threading.Lock()
+        # Restaurant ID -> row; only writers use it, under _write_lock
+        self._id_rows = {rid: i for i, rid in enumerate(df['Restaurant ID'])}
+        # incoming ids are coerced to this type, so "3400005" finds 3400005
+        self._int_ids = pd.api.types.is_integer_dtype(df['Restaurant ID'])
+        # username -> (taste vector, restaurant names already folded into it)
+        self._tastes = {}
+        self._taste_lock = threading.Lock()
+        # cuisine co-occurrence graph, built on first use (one per model = dataset version)
+        self._cuisine_graph = None
+        self._graph_lock = threading.Lock()
+
+        state = ModelState(
+            df=df,
+            feature_matrix=feature_matrix,
+            # Running column sum of feature rows -> mean similarity without an n x n matrix
+            feature_sum=np.asarray(feature_matrix.sum(axis=0)).ravel(),
+            # Removed rows stay in place as tombstones so positions never shift
+            active=np.ones(len(df), dtype=bool),
+            # Row positions per clean city name (candidate restriction)
+            city_rows={
+                c: np.asarray(idx, dtype=np.int64)
+                for c, idx in df.groupby('City Clean').indices.items()
+            },
+            price=clean_price(df),
+            rating=clean_rating(df),
+            # "Average Cost for two" in one currency (model/currency.py)
+            cost=clean_cost(df),
         )
-        # Vectorize & similarity matrix
-        self.vectorizer = CountVectorizer(stop_words='english')
-        self.feature_matrix = self.vectorizer.fit_transform(self.df['combined'])
-        self.similarity = cosine_similarity(self.feature_matrix, self.feature_matrix)
+        # Vote-weighted quality; city priors are fixed at build time and
+        # also score rows added later (a reload recomputes them)
+        self.quality_priors = quality_priors(state.rating, clean_votes(df), df['City Clean'].to_numpy())
+        state.quality = self._quality(df)
+        # lowercased "Cuisines" factorized: substring tests run once per distinct value
+        codes, values = pd.factorize(df['Cuisines'].astype(str).str.lower())
+        state.cuisine_codes = codes.astype(np.int64)
+        state.cuisine_values = list(values)
+        state.cuisine_lookup = {v: i for i, v in enumerate(values)}
+        # Top-K same-city neighbours per row, best first (-1 / -inf padded)
+        neighbor_idx = np.full((len(df), n_neighbors), -1, dtype=np.int64)
+        neighbor_sim = np.full((len(df), n_neighbors), -np.inf, dtype=np.float32)
+        for rows in state.city_rows.values():
+            neighbor_idx[rows], neighbor_sim[rows] = self.engine.search(feature_matrix, rows, rows, n_neighbors)
+        state.neighbors = NeighborTable(_freeze(neighbor_idx), _freeze(neighbor_sim))
+        self.state = state.freeze()
+
+    # read-only views of the current version
+    @property
+    def df(self):
+        return self.state.df
+
+    @property
+    def feature_matrix(self):
+        return self.state.feature_matrix
+
+    @property
+    def neighbor_idx(self):
+        return self.state.neighbors.arrays()[0]
+
+    @property
+    def neighbor_sim(self):
+        return self.state.neighbors.arrays()[1]
+
+    @classmethod
+    def from_neighbor_db(cls, db_path=None):
+        """
+        Recommender backed by the table written by build_neighbors.py; it
+        holds no model in memory and only recommend() is available. Importing
+        this module still loads pandas / scikit-learn: a serving worker that
+        should start without them uses model.neighbor_store.NeighborStore.
+        """
+        from model.neighbor_store import NEIGHBOR_DB_PATH, NeighborStore
+
+        recommender = cls.__new__(cls)
+        recommender.store = NeighborStore(db_path or NEIGHBOR_DB_PATH)
+        return recommender
+
+    def __getattr__(self, name):
+        # only reached for attributes the instance lacks, i.e. model data
+        # on a from_neighbor_db() instance
+        if self.store is not None and not name.startswith('__'):
+            raise RuntimeError(
+                "This recommender was opened with from_neighbor_db() and only serves "
+                "recommend(); the other methods need FoodRecommender(data_path)"
+            )
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    # ---------- Shared helpers ----------
+    def _restaurant_id(self, rid):
+        # the dataset's id type; ValueError for a missing or malformed id
+        if isinstance(rid, str):
+            rid = rid.strip()
+        if rid is None or rid == '' or (isinstance(rid, float) and np.isnan(rid)):
+            raise ValueError("Restaurant ID missing")
+        if not self._int_ids:
+            return str(rid)
+        if isinstance(rid, (float, np.floating)) and not float(rid).is_integer():
+            raise ValueError(f"Restaurant ID must be an integer: {rid!r}")
+        try:
+            return int(rid)
+        except (TypeError, ValueError):
+            raise ValueError(f"Restaurant ID must be an integer: {rid!r}") from None
+
+    def _lookup(self, restaurant_id):
+        # row of a live restaurant, None for an unknown or malformed id
+        try:
+            return self._id_rows.get(self._restaurant_id(restaurant_id))
+        except ValueError:
+            return None
+
+    def _quality(self, df):
+        priors, global_prior = self.quality_priors
+        prior = df['City Clean'].map(priors).fillna(global_prior).to_numpy(dtype=float)
+        return quality_score(clean_rating(df), clean_votes(df), prior)
+
+    def _city_candidates(self, state, city_q):
+        # exact city first, else every city containing the text, else everything
+        if not city_q:
+            return np.flatnonzero(state.active)
+        if city_q in state.city_rows:
+            return state.city_rows[city_q]
+        parts = [rows for c, rows in state.city_rows.items() if city_q in c]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def _city_mask(self, state, city_q):
+        # every city whose clean name contains the text (tolerant match)
+        mask = np.zeros(len(state.active), dtype=bool)
+        for c, rows in state.city_rows.items():
+            if city_q in c:
+                mask[rows] = True
+        return mask
+
+    def _collect(self, state, ranked, top_n, exclude=()):
+        # walk ranked (row, score) pairs, one result per display name
+        results = []
+        seen = set(exclude)
+        for idx, sc in ranked:
+            row = state.df.iloc[idx]
+
+            name = row["Restaurant Name"].strip().title()
+            if name in seen:
+                continue
+            seen.add(name)
+
+            results.append(self._result_tuple(row, sc))
+
+            if len(results) >= top_n:
+                break
+
+        return results
+
+    def _result_tuple(self, row, score):
+        name = row["Restaurant Name"].strip().title()
+        # lat/lon safe conversion
+        try:
+            lat = float(row.get("Latitude", 0) or 0)
+            lon = float(row.get("Longitude", 0) or 0)
+        except Exception:
+            lat, lon = 0.0, 0.0
+
+        address = row.get("Address", "")  # <- dataset address column
+        return (
+            name,
+            row.get("Cuisines", ""),
+            row.get("City", "").title(),
+            round(score, 3),
+            lat,
+            lon,
+            address
+        )
+
+    def _fill_neighbors(self, state, rows, targets):
+        # top-K among same-city `rows` for every row in `targets` (writers only)
+        idx, sims = self.engine.search(state.feature_matrix, rows, targets, self.n_neighbors)
+        state.neighbors.set(targets, idx, sims)
+
+    def _ranked_neighbors(self, state, base_idx, city_q):
+        # precomputed list first, then the rest of the city if a caller needs more
+        yielded = set()
+        for idx, sc in zip(*state.neighbors.get(base_idx)):
+            if idx < 0:
+                break
+            yielded.add(idx)
+            yield idx, float(sc)
+
+        rows = state.city_rows.get(city_q, np.empty(0, dtype=np.int64))
+        sims = (state.feature_matrix[rows] @ state.feature_matrix[base_idx].T).toarray().ravel()
+        for pos in np.argsort(-sims, kind='stable'):
+            idx = rows[pos]
+            if idx == base_idx or idx in yielded:
+                continue
+            yield idx, float(sims[pos])
+
+    def _diversify(self, state, ranked, top_n, diversity, pool_size=None, precomputed=0):
+        """
+        Maximal marginal relevance over up to `pool_size` candidates with
+        distinct names: each pick maximises
+            (1 - diversity) * relevance - diversity * (max similarity to earlier picks).
+        The pool stops at the `precomputed` neighbour list once it holds
+        top_n names, so the city scan behind it runs only when plain
+        recommend() would need it too. Similarities are computed only against
+        each pick as it is made (pool x top_n, not pool x pool). Yields picks
+        with their original scores.
+        """
+        pool_size = pool_size or MMR_POOL_FACTOR * top_n
+        names = state.df['Restaurant Name Clean'].to_numpy()
+        rows, relevance, seen = [], [], set()
+        for taken, (idx, sc) in enumerate(ranked, 1):
+            if names[idx] not in seen:
+                seen.add(names[idx])
+                rows.append(idx)
+                relevance.append(sc)
+            if len(rows) >= pool_size or (taken >= precomputed and len(rows) >= top_n):
+                break
+        if not rows:
+            return
+
+        relevance = np.asarray(relevance)
+        # only the pool's own hash columns: the product never touches 2**20 columns
+        features = state.feature_matrix[np.asarray(rows)]
+        cols, indices = np.unique(features.indices, return_inverse=True)
+        features = sp.csr_matrix((features.data, indices, features.indptr), shape=(len(rows), len(cols))).toarray()
+        closest = np.zeros(len(rows))   # max similarity to anything picked so far
+        free = np.ones(len(rows), dtype=bool)
+        picks = min(top_n, len(rows))
+        for n in range(picks):
+            gain = np.where(free, (1 - diversity) * relevance - diversity * closest, -np.inf)
+            i = int(np.argmax(gain))
+            free[i] = False
+            yield rows[i], float(relevance[i])
+            if n + 1 < picks:
+                # float32 like the neighbour scores, so last-bit noise never breaks ties
+                np.maximum(closest, (features @ features[i]).astype(np.float32), out=closest)
 
     # ---------- Restaurant-based recommendation ----------
-    def recommend(self, restaurant_name, city_name, top_n=10):
+    def recommend(self, restaurant_name, city_name, top_n=10, diversity=0.0):
+        """
+        diversity in [0, 1): 0 ranks purely by similarity; higher values
+        trade similarity for variety among the results (MMR re-ranking).
+        """
+        if not 0 <= diversity < 1:
+            raise ValueError(f"diversity must be in [0, 1), got {diversity!r}")
+        if self.store is not None:
+            if diversity:
+                raise ValueError("diversity needs the in-memory model, not from_neighbor_db()")
+            return self.store.recommend(restaurant_name, city_name, top_n)
+
+        state = self.state
+        df = state.df
         rn = restaurant_name.strip().lower()
         cn = city_name.strip().lower()
 
         # Try exact match first (clean columns)
-        exact_matches = self.df[
-            (self.df['Restaurant Name Clean'] == rn) &
-            (self.df['City Clean'] == cn)
+        exact_matches = df[
+            state.active &
+            (df['Restaurant Name Clean'] == rn) &
+            (df['City Clean'] == cn)
         ]
 
-        # If no exact match, fallback to contains on name within the city
+        # If no exact match, fallback to a literal contains on name within the
+        # city (user text, not a regex; same as NeighborStore's instr)
         if exact_matches.empty:
-            exact_matches = self.df[
-                (self.df['Restaurant Name'].str.lower().str.contains(rn, na=False)) &
-                (self.df['City Clean'] == cn)
+            exact_matches = df[
+                state.active &
+                (df['Restaurant Name'].str.lower().str.contains(rn, regex=False, na=False)) &
+                (df['City Clean'] == cn)
             ]
 
         if exact_matches.empty:
@@ -43,194 +523,409 @@ class FoodRecommender:
 
         base_idx = exact_matches.index[0]
 
-        # similarity scores against base
-        scores = list(enumerate(self.similarity[base_idx]))
-        scores = sorted(scores, key=lambda x: x[1], reverse=True)
-
-        results = []
-        seen = set()
-
-        for idx, sc in scores:
-            if idx == base_idx:
-                continue
-            row = self.df.iloc[idx]
-
-            # ensure same city
-            if row['City Clean'] != cn:
-                continue
-
-            name = row['Restaurant Name'].strip().title()
-            if name in seen:
-                continue
-            seen.add(name)
-
-            # lat/lon safe conversion
-            try:
-                lat = float(row.get('Latitude', 0) or 0)
-                lon = float(row.get('Longitude', 0) or 0)
-            except Exception:
-                lat, lon = 0.0, 0.0
-
-            address = row.get("Address", "")  # <- dataset address column
-            results.append((
-                name,
-                row.get('Cuisines', ''),
-                row.get('City', '').title(),
-                round(sc, 3),
-                lat,
-                lon,
-                address
-            ))
-
-            if len(results) >= top_n:
-                break
-
-        return results
+        # same-city neighbours, most similar first
+        ranked = self._ranked_neighbors(state, base_idx, cn)
+        if diversity:
+            precomputed = int((state.neighbors.get(base_idx)[0] >= 0).sum())
+            ranked = self._diversify(state, ranked, top_n, diversity, precomputed=precomputed)
+        return self._collect(state, ranked, top_n)
 
     # ---------- Preferences-based recommendation ----------
-    def recommend_by_preferences(self, cuisine, city, price, rating, top_n=10):
+    def plan_preferences(self, cuisine, city, price, rating, state=None, min_cost=None, max_cost=None):
+        """
+        Evaluate each predicate once as a row bitmap, then walk the relaxation
+        ladder by AND-ing the cached bitmaps. Returns (row positions, tier),
+        tier indexing PREFERENCE_TIERS. The min_cost / max_cost budget (cost
+        for two in BASE_CURRENCY) is relaxed together with the price range.
+        """
+        state = state or self.state
+        n = len(state.active)
+        everything = np.ones(n, dtype=bool)
 
         # normalize inputs
         cuisine_q = cuisine.strip().lower() if cuisine else ""
         city_q = city.strip().lower() if city else ""
 
-        # ----- SAFE CLEANUPS ON DF COLUMNS -----
-        # Ensure helper clean columns exist
-        if "City Clean" not in self.df.columns:
-            self.df["City Clean"] = self.df["City"].astype(str).str.strip().str.lower()
-        if "Restaurant Name Clean" not in self.df.columns:
-            self.df["Restaurant Name Clean"] = self.df["Restaurant Name"].astype(str).str.strip().str.lower()
-
-        # Normalize price into integer "PriceClean" where possible
-        def safe_price(x):
-            try:
-                return int(float(x))
-            except Exception:
-                return None
-
-        if "Price Clean" not in self.df.columns:
-            self.df["Price Clean"] = self.df.get("Price range", "").apply(safe_price)
-
-        # Normalize rating to float safely
-        def safe_rating(x):
-            try:
-                return float(x)
-            except Exception:
-                return 0.0
+        # city: contains on the clean name (tolerant), resolved per distinct city
+        city_mask = self._city_mask(state, city_q) if city_q else everything
 
-        if "Rating Clean" not in self.df.columns:
-            self.df["Rating Clean"] = self.df.get("Aggregate rating", "").apply(safe_rating)
-
-        # ----- FLEXIBLE FILTERING -----
-        mask = pd.Series(True, index=self.df.index)
-
-        # city: use contains on cleaned column (tolerant)
-        if city_q:
-            mask &= self.df["City Clean"].str.contains(city_q, na=False)
-
-        # cuisine: contains (tolerant)
+        # cuisine: contains, tested once per distinct cuisine string
+        cuisine_mask = everything
         if cuisine_q:
-            mask &= self.df["Cuisines"].astype(str).str.lower().str.contains(cuisine_q, na=False)
+            hits = np.array([cuisine_q in v for v in state.cuisine_values], dtype=bool)
+            cuisine_mask = hits[state.cuisine_codes]
 
-        # price: allow approximate matching (+-1) because dataset formats vary
+        # price: approximate (+-1) window from the sorted price array;
+        # rows with a missing price always pass
+        price_mask = everything
         if price is not None:
             try:
-                # price from UI is usually int already
                 price_int = int(price)
-                # Accept entries with PriceClean near the selected price OR missing PriceClean (fallback)
-                mask_price = (
-                    self.df["Price Clean"].notna() &
-                    (self.df["Price Clean"] >= (price_int - 1)) &
-                    (self.df["Price Clean"] <= (price_int + 1))
-                )
-                # Combine: prefer those matching price window but allow rows with missing price if none matched
-                mask &= (mask_price | self.df["Price Clean"].isna())
+                lo = np.searchsorted(state.price_sorted, price_int - 1, 'left')
+                hi = np.searchsorted(state.price_sorted, price_int + 1, 'right')
+                missing = np.searchsorted(state.price_sorted, np.nan, 'left')
+                price_mask = np.zeros(n, dtype=bool)
+                price_mask[state.price_order[lo:hi]] = True
+                price_mask[state.price_order[missing:]] = True
             except Exception:
                 # if conversion fails, do not filter by price
                 pass
 
-        # rating: numeric compare
+        # rating: suffix of the sorted rating array
+        rating_mask = everything
         if rating is not None:
             try:
-                rating_val = float(rating)
-                mask &= self.df["Rating Clean"] >= rating_val
+                start = np.searchsorted(state.rating_sorted, float(rating), 'left')
+                rating_mask = np.zeros(n, dtype=bool)
+                rating_mask[state.rating_order[start:]] = True
             except Exception:
                 pass
 
-        filtered = self.df[mask]
-
-        # ----- FALLBACKS if filtered is empty (be progressively more permissive) -----
-        if filtered.empty:
-            # 1) Relax price (ignore price), keep city & cuisine & rating
-            mask2 = pd.Series(True, index=self.df.index)
-            if city_q:
-                mask2 &= self.df["City Clean"].str.contains(city_q, na=False)
-            if cuisine_q:
-                mask2 &= self.df["Cuisines"].astype(str).str.lower().str.contains(cuisine_q, na=False)
-            if rating is not None:
-                try:
-                    mask2 &= self.df["Rating Clean"] >= float(rating)
-                except Exception:
-                    pass
-            filtered = self.df[mask2]
-
-        if filtered.empty:
-            # 2) Relax cuisine too (keep only city & rating)
-            mask3 = pd.Series(True, index=self.df.index)
-            if city_q:
-                mask3 &= self.df["City Clean"].str.contains(city_q, na=False)
-            if rating is not None:
-                try:
-                    mask3 &= self.df["Rating Clean"] >= float(rating)
-                except Exception:
-                    pass
-            filtered = self.df[mask3]
-
-        if filtered.empty:
-            # 3) Relax to city only (no rating)
-            if city_q:
-                filtered = self.df[self.df["City Clean"].str.contains(city_q, na=False)]
-
-        if filtered.empty:
-            # 4) Give up and use full dataset as last resort (so user always gets results)
-            filtered = self.df.copy()
-
-        # ----- SCORING: use similarity metric as ranking (average similarity proxy) -----
-        sims = []
-        for idx in filtered.index:
-            sims.append((idx, float(self.similarity[idx].mean())))
-
-        sims = sorted(sims, key=lambda x: x[1], reverse=True)
-
-        # ----- BUILD RESULTS -----
-        results = []
-        seen = set()
-        for idx, sc in sims:
-            row = self.df.iloc[idx]
-            name = row["Restaurant Name"].strip().title()
-            if name in seen:
-                continue
-            seen.add(name)
+        # budget: [min_cost, max_cost] slice of the sorted cost array;
+        # unknown costs sort last and never match a budget
+        if min_cost is not None or max_cost is not None:
+            known = np.searchsorted(state.cost_sorted, np.nan, 'left')
+            lo = 0 if min_cost is None else np.searchsorted(state.cost_sorted[:known], float(min_cost), 'left')
+            hi = known if max_cost is None else np.searchsorted(state.cost_sorted[:known], float(max_cost), 'right')
+            cost_mask = np.zeros(n, dtype=bool)
+            cost_mask[state.cost_order[lo:hi]] = True
+            price_mask = price_mask & cost_mask
+
+        # ----- RELAXATION LADDER (progressively more permissive) -----
+        base = state.active & city_mask
+        ladder = [
+            lambda: base & cuisine_mask & price_mask & rating_mask,
+            lambda: base & cuisine_mask & rating_mask,
+            lambda: base & rating_mask,
+            # "city only" needs a city; without one, fall through to everything
+            lambda: base if city_q else np.zeros(n, dtype=bool),
+            # last resort so the user always gets results
+            lambda: state.active,
+        ]
+        for tier, combine in enumerate(ladder):
+            rows = np.flatnonzero(combine())
+            if len(rows):
+                return rows, tier
+        return rows, len(ladder) - 1
+
+    def recommend_by_preferences(self, cuisine, city, price, rating, top_n=10, explain=False,
+                                 min_cost=None, max_cost=None, rank_by="similarity", quality_weight=0.5):
+        """
+        rank_by: "similarity" (mean similarity, the default), "quality"
+        (vote-weighted rating) or "blend", quality_weight * quality/5 plus
+        the rest of the weight on similarity scaled to the best candidate.
+        """
+        if rank_by not in RANKINGS:
+            raise ValueError(f"rank_by must be one of {RANKINGS}, got {rank_by!r}")
+        state = self.state
+        rows, tier = self.plan_preferences(cuisine, city, price, rating, state=state,
+                                           min_cost=min_cost, max_cost=max_cost)
+
+        # ----- SCORING -----
+        if rank_by == "similarity":
+            scores = state.mean_sim[rows]
+        elif rank_by == "quality":
+            scores = state.quality[rows]
+        else:
+            sim = state.mean_sim[rows]
+            top = sim.max() if len(sim) else 0.0
+            sim = sim / top if top > 0 else sim
+            scores = quality_weight * state.quality[rows] / 5.0 + (1 - quality_weight) * sim
+        results = self._collect(state, _iter_ranked(rows, scores), top_n)
+        if explain:
+            return results, PREFERENCE_TIERS[tier]
+        return results
 
-            try:
-                lat = float(row.get("Latitude", 0) or 0)
-                lon = float(row.get("Longitude", 0) or 0)
-            except Exception:
-                lat, lon = 0.0, 0.0
+    # ---------- Free-text recommendation ----------
+    def recommend_by_text(self, query, city, top_n=10):
+        # Project the query into the same feature space as the restaurants
+        q = self.vectorizer.transform([query or ""])
+        if q.nnz == 0:
+            return []
 
-            addr = row.get("Address", "") if "Address" in row.index else ""
+        state = self.state
+        rows = self._city_candidates(state, city.strip().lower() if city else "")
+        if len(rows) == 0:
+            return []
 
-            results.append((
-                name,
-                row.get("Cuisines", ""),
-                row.get("City", "").title(),
-                round(sc, 3),
-                lat,
-                lon,
-                addr
-            ))
+        # cosine via one sparse matrix-vector product over the candidate rows
+        scores = (state.feature_matrix[rows] @ normalize(q).T).toarray().ravel()
+
+        matched = scores > 0
+        return self._collect(state, _iter_ranked(rows[matched], scores[matched]), top_n)
+
+    # ---------- Results for external row ids ----------
+    def results_for_rows(self, rows, scores=None, top_n=10):
+        """
+        Result tuples for dataset row ids found elsewhere (e.g. full-text
+        search), in the given order. Removed or unknown rows are skipped.
+        """
+        state = self.state
+        rows = np.asarray(rows, dtype=np.int64)
+        scores = np.zeros(len(rows)) if scores is None else np.asarray(scores, dtype=float)
+        keep = (rows >= 0) & (rows < len(state.active))
+        rows, scores = rows[keep], scores[keep]
+        keep = state.active[rows]
+        return self._collect(state, zip(rows[keep], scores[keep]), top_n)
+
+    # ---------- Personalized recommendation ----------
+    def _visit_vector(self, state, restaurant_name):
+        # a tried restaurant (display name) -> unit mean of its feature rows;
+        # chains count once, not once per branch
+        key = restaurant_name.strip().lower()
+        rows = np.flatnonzero(state.active & (state.df['Restaurant Name Clean'].to_numpy() == key))
+        if len(rows) == 0:
+            return None
+        return normalize(sp.csr_matrix(np.ones((1, len(rows)))) @ state.feature_matrix[rows])
+
+    def _taste(self, state, username, history):
+        # fold only visits not seen before into the cached vector
+        with self._taste_lock:
+            taste, folded = self._tastes.get(username, (None, frozenset()))
+        new = sorted(set(history) - folded)
+        if not new:
+            return taste, folded
+
+        for name in new:
+            vec = self._visit_vector(state, name)
+            if vec is not None:
+                taste = vec if taste is None else taste + vec
+        folded = folded | set(new)
+        with self._taste_lock:
+            self._tastes[username] = (taste, folded)
+        return taste, folded
+
+    def add_visit(self, username, restaurant_name):
+        """Update a user's cached taste vector with one new visit."""
+        self._taste(self.state, username, [restaurant_name])
+
+    def recommend_for_user(self, username, city, top_n=10, history=None):
+        """
+        Rank restaurants by cosine similarity to the user's taste vector
+        (sum of their tried restaurants' features), skipping places they
+        already tried. `history` is the set of tried restaurant names; when
+        omitted it is read from user_restaurant_history. Returns [] for a
+        user with no usable history.
+        """
+        if history is None:
+            from database.db import get_user_history
+            history = get_user_history(username)
+
+        state = self.state
+        taste, tried = self._taste(state, username, history)
+        if taste is None:
+            return []
 
-            if len(results) >= top_n:
-                break
+        rows = self._city_candidates(state, city.strip().lower() if city else "")
+        if len(rows) == 0:
+            return []
+
+        # one sparse product over the candidate rows
+        scores = (state.feature_matrix[rows] @ normalize(taste).T).toarray().ravel()
+
+        matched = scores > 0
+        return self._collect(state, _iter_ranked(rows[matched], scores[matched]), top_n, exclude=tried)
+
+    # ---------- Cuisine exploration ----------
+    def cuisine_graph(self):
+        # rows added after the build are not in the graph until the next reload
+        if self._cuisine_graph is None:
+            with self._graph_lock:
+                if self._cuisine_graph is None:
+                    self._cuisine_graph = CuisineGraph(self.state.df)
+        return self._cuisine_graph
+
+    def suggest_cuisines(self, username, city, limit=3, per_cuisine=3, history=None):
+        """
+        "Adjacent cuisines you haven't tried": cuisines that co-occur most
+        with the ones in the user's history, each with its best
+        (vote-weighted) restaurants in `city`. Returns a list of dicts
+        {cuisine, score, because, restaurants}; cuisines with no open
+        restaurant in the city are skipped.
+        """
+        if history is None:
+            from database.db import get_user_history
+            history = get_user_history(username)
+
+        state = self.state
+        graph = self.cuisine_graph()
+        tried = graph.cuisines_of(history)
+        if not tried:
+            return []
 
-        return results
\ No newline at end of file
+        city_rows = self._city_candidates(state, city.strip().lower() if city else "")
+        suggestions = []
+        for cuisine, score, because in graph.suggest(tried):
+            rows = np.intersect1d(graph.rows[graph.ids[cuisine]], city_rows, assume_unique=True)
+            rows = rows[state.active[rows]]
+            if len(rows) == 0:
+                continue
+            restaurants = self._collect(state, _iter_ranked(rows, state.quality[rows]), per_cuisine,
+                                        exclude=history)
+            if not restaurants:
+                continue
+            suggestions.append({
+                "cuisine": cuisine.title(),
+                "score": round(score, 3),
+                "because": [c.title() for c in because],
+                "restaurants": restaurants,
+            })
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    # ---------- Incremental updates ----------
+    # Writers work on a private draft of the current state and publish it
+    # with a single reference swap; in-flight reads keep their old version.
+    def add_restaurants(self, rows):
+        """
+        Append restaurants (dicts or a DataFrame with the dataset columns)
+        without a refit. Returns the new row positions.
+        """
+        new = pd.DataFrame(rows).reindex(columns=self.source_columns).fillna('')
+        if new.empty:
+            return []
+        add_clean_columns(new)
+
+        with self._write_lock:
+            draft = self.state.draft()
+            ids = {}
+            positions = self._append(draft, new, ids)
+            self._publish(draft, ids)
+        return positions
+
+    def update_restaurant(self, restaurant_id, row):
+        """
+        Apply field changes to one restaurant. Returns its (possibly new)
+        row position, or None if the id is unknown.
+        """
+        with self._write_lock:
+            pos = self._lookup(restaurant_id)
+            if pos is None:
+                return None
+            restaurant_id = self._restaurant_id(restaurant_id)
+            draft = self.state.draft()
+            ids = {}
+            merged = {c: draft.df.at[pos, c] for c in self.source_columns}
+            merged.update(row)
+            merged['Restaurant ID'] = restaurant_id
+
+            # only name / cuisines / city feed the features; anything else is a cell edit
+            if all(str(merged[c]) == str(draft.df.at[pos, c]) for c in ('Restaurant Name', 'Cuisines', 'City')):
+                # new frame sharing every column but the edited ones
+                draft.df = draft.df.copy(deep=False)
+                for c in self.source_columns:
+                    if str(merged[c]) != str(draft.df.at[pos, c]):
+                        column = draft.df[c].copy()
+                        column.at[pos] = merged[c]
+                        draft.df[c] = column
+                draft.own('price', 'rating', 'cost', 'quality')
+                draft.price[pos] = clean_price(draft.df.loc[[pos]])[0]
+                draft.rating[pos] = clean_rating(draft.df.loc[[pos]])[0]
+                draft.cost[pos] = clean_cost(draft.df.loc[[pos]])[0]
+                draft.quality[pos] = self._quality(draft.df.loc[[pos]])[0]
+                draft.touch(pos)
+            else:
+                ids[restaurant_id] = None
+                self._unlink(draft, pos)
+                new = add_clean_columns(pd.DataFrame([merged]).reindex(columns=self.source_columns))
+                pos = self._append(draft, new, ids)[0]
+
+            self._publish(draft, ids)
+            return pos
+
+    def remove_restaurant(self, restaurant_id):
+        with self._write_lock:
+            pos = self._lookup(restaurant_id)
+            if pos is None:
+                return False
+            draft = self.state.draft()
+            self._unlink(draft, pos)
+            self._publish(draft, {self._restaurant_id(restaurant_id): None})
+            return True
+
+    def _publish(self, draft, ids):
+        # swap the new version in, then apply its id changes (None = removed)
+        self.state = draft.freeze()
+        for rid, pos in ids.items():
+            if pos is None:
+                self._id_rows.pop(rid, None)
+            else:
+                self._id_rows[rid] = pos
+
+    def _append(self, draft, new, ids):
+        new['Restaurant ID'] = [self._restaurant_id(rid) for rid in new['Restaurant ID']]
+        if self._int_ids:
+            new['Restaurant ID'] = new['Restaurant ID'].astype(np.int64)
+        dup = new['Restaurant ID'].duplicated()
+        if dup.any():
+            raise ValueError(f"Restaurant ID repeated in the batch: {new.loc[dup, 'Restaurant ID'].tolist()}")
+        for rid in new['Restaurant ID']:
+            if ids.get(rid, self._id_rows.get(rid)) is not None:
+                raise ValueError(f"Restaurant ID already present: {rid!r}")
+
+        start = len(draft.df)
+        positions = np.arange(start, start + len(new))
+        new.index = positions
+        draft.df = pd.concat([draft.df, new])
+
+        features = normalize(self.vectorizer.transform(new['combined']))
+        draft.feature_matrix = sp.vstack([draft.feature_matrix, features]).tocsr()
+        self.engine.add(features)
+        draft.own('feature_sum', 'cuisine_values', 'cuisine_lookup')
+        draft.feature_sum += np.asarray(features.sum(axis=0)).ravel()
+        draft.active = np.concatenate([draft.active, np.ones(len(new), dtype=bool)])
+        draft.price = np.concatenate([draft.price, clean_price(new)])
+        draft.rating = np.concatenate([draft.rating, clean_rating(new)])
+        draft.cost = np.concatenate([draft.cost, clean_cost(new)])
+        draft.quality = np.concatenate([draft.quality, self._quality(new)])
+        draft.touch(positions)
+        codes = [
+            draft.cuisine_lookup.setdefault(v, len(draft.cuisine_lookup))
+            for v in new['Cuisines'].astype(str).str.lower()
+        ]
+        draft.cuisine_values.extend(list(draft.cuisine_lookup)[len(draft.cuisine_values):])
+        draft.cuisine_codes = np.concatenate([draft.cuisine_codes, np.asarray(codes, dtype=np.int64)])
+        draft.neighbors.grow(len(draft.df))
+
+        for pos, rid, city in zip(positions, new['Restaurant ID'], new['City Clean']):
+            ids[rid] = int(pos)
+            draft.city_rows[city] = np.append(draft.city_rows.get(city, np.empty(0, dtype=np.int64)), pos)
+        for pos in positions:
+            self._link(draft, pos)
+        return positions.tolist()
+
+    def _link(self, draft, pos):
+        # give `pos` its own list, then slot it into neighbours' lists where it ranks
+        rows = draft.city_rows[draft.df.at[pos, 'City Clean']]
+        self._fill_neighbors(draft, rows, np.array([pos]))
+
+        others = rows[rows != pos]
+        sims = (draft.feature_matrix[others] @ draft.feature_matrix[pos].T).toarray().ravel()
+        current_idx, current_sim = draft.neighbors.take(others)
+        # rows added in the same batch may already list `pos`
+        better = (sims > current_sim[:, -1]) & ~(current_idx == pos).any(axis=1)
+        if not better.any():
+            return
+        targets = others[better]
+        idx = np.hstack([current_idx[better], np.full((len(targets), 1), pos)])
+        sc = np.hstack([current_sim[better], sims[better, None].astype(np.float32)])
+        order = np.argsort(-sc, axis=1, kind='stable')[:, :self.n_neighbors]
+        draft.neighbors.set(targets, np.take_along_axis(idx, order, axis=1), np.take_along_axis(sc, order, axis=1))
+
+    def _unlink(self, draft, pos):
+        city = draft.df.at[pos, 'City Clean']
+        draft.own('active', 'feature_sum')
+        draft.active[pos] = False
+        features = draft.feature_matrix[pos]
+        draft.feature_sum[features.indices] -= features.data
+        rows = draft.city_rows[city]
+        rows = rows[rows != pos]
+        draft.city_rows[city] = rows
+        empty_idx = np.full((1, self.n_neighbors), -1, dtype=np.int64)
+        draft.neighbors.set([pos], empty_idx, np.full((1, self.n_neighbors), -np.inf, dtype=np.float32))
+
+        # only rows that listed `pos` need their neighbours recomputed
+        affected = rows[(draft.neighbors.take(rows)[0] == pos).any(axis=1)]
+        if len(affected):
+            self._fill_neighbors(draft, rows, affected)
\ No newline at end of file
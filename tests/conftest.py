@@ -0,0 +1,11 @@
+import pytest
+
+import database.db as db
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """A fresh FoodQuest database for one test."""
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "foodquest.db"))
+    db.init_db()
+    return db.DB_PATH
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""HTTP API: bad input is a 400, unknown users a 404, visits are recorded once."""
+import json
+import shutil
+import tempfile
+
+import pandas as pd
+from tornado.testing import AsyncHTTPTestCase
+
+import database.db as db
+from api_server import Backend, make_app
+from database.db import register_user
+from model.coalesce import CoalescingRecommender
+from model.recommender import FoodRecommender
+
+
+class ApiTest(AsyncHTTPTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        path = f"{cls.tmp}/small.csv"
+        pd.read_csv("data/Dataset.csv").head(300).to_csv(path, index=False)
+        cls.model = FoodRecommender(path)
+        cls.restaurant = cls.model.df["Restaurant Name"].iloc[0]
+        cls.city = cls.model.df["City"].iloc[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        self.db_path = db.DB_PATH
+        db.DB_PATH = tempfile.mkstemp(suffix=".db", dir=self.tmp)[1]
+        db.init_db()
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.backend.pool.shutdown()
+        db.DB_PATH = self.db_path
+
+    def get_app(self):
+        self.backend = Backend(CoalescingRecommender(self.model), workers=2)
+        return make_app(self.backend)
+
+    def get_json(self, url, **kwargs):
+        response = self.fetch(url, **kwargs)
+        return response.code, json.loads(response.body)
+
+    def test_recommend(self):
+        code, body = self.get_json(f"/recommend?restaurant={self.restaurant}&city={self.city}&top_n=3")
+        assert code == 200
+        assert 0 < len(body["results"]) <= 3
+
+    def test_bad_numbers_are_400(self):
+        base = f"/recommend?restaurant={self.restaurant}&city={self.city}"
+        for query in ("&top_n=0", "&top_n=-1", "&top_n=ten", "&diversity=1", "&diversity=-0.5"):
+            code, body = self.get_json(base + query)
+            assert code == 400, query
+            assert body["error"]
+        for url in ("/search?q=pizza&top_n=-2", "/challenges/cuisines?username=asha&limit=0",
+                    "/recommend/user?username=asha&top_n=0", "/recommend/preferences?top_n=0",
+                    "/recommend/preferences?rank_by=Quality"):
+            assert self.fetch(url).code == 400, url
+
+    def test_missing_argument_is_400(self):
+        code, body = self.get_json("/recommend?restaurant=x")
+        assert code == 400
+        assert "city" in body["error"]
+
+    def test_regex_characters_are_literal(self):
+        code, body = self.get_json(f"/recommend?restaurant=(&city={self.city}")
+        assert code == 200
+
+    def test_visit_body_must_be_json(self):
+        for body in ("not json", json.dumps({"username": "asha"}), json.dumps([1])):
+            assert self.fetch("/visits", method="POST", body=body).code == 400
+
+    def test_visit_unknown_user_is_404(self):
+        body = json.dumps({"username": "nobody", "restaurant": self.restaurant})
+        code, payload = self.get_json("/visits", method="POST", body=body)
+        assert code == 404
+        assert "nobody" in payload["error"]
+
+    def test_visit_is_recorded_once(self):
+        register_user("asha", "pw")
+        body = json.dumps({"username": "asha", "restaurant": self.restaurant})
+        code, payload = self.get_json("/visits", method="POST", body=body)
+        assert (code, payload["new_visit"]) == (201, True)
+        code, payload = self.get_json("/visits", method="POST", body=body)
+        assert (code, payload["new_visit"]) == (200, False)
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""SingleFlight and CoalescingRecommender: concurrent identical calls share one execution."""
+import threading
+import time
+
+import pytest
+
+from model.coalesce import CoalescingRecommender, SingleFlight
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _run_concurrently(n, target):
+    results = [None] * n
+    errors = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        release.wait(5)
+        return [1, 2, 3]
+
+    threads, results, errors = _run_concurrently(8, lambda: flight.do("key", slow))
+    _wait_for(lambda: flight.stats()["coalesced"] == 7)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert errors == [None] * 8
+    assert results == [[1, 2, 3]] * 8
+    assert len(runs) == 1
+    stats = flight.stats()
+    assert (stats["calls"], stats["executions"], stats["in_flight"]) == (8, 1, 0)
+
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise KeyError("boom")
+
+    threads, results, errors = _run_concurrently(4, lambda: flight.do("key", failing))
+    _wait_for(lambda: flight.stats()["coalesced"] == 3)
+    release.set()
+    for t in threads:
+        t.join()
+    assert all(isinstance(e, KeyError) for e in errors)
+
+
+def test_finished_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+    for _ in range(3):
+        flight.do("key", calls.append, 1)
+    assert len(calls) == 3
+    assert flight.stats()["coalesced"] == 0
+
+
+class _Model:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def recommend_by_preferences(self, cuisine, city, price, rating, rank_by="similarity"):
+        self.calls.append((cuisine, city, rank_by))
+        self.release.wait(5)
+        if rank_by not in ("similarity", "quality"):
+            raise ValueError(rank_by)
+        return [(cuisine, city)]
+
+
+def test_case_folded_arguments_share_a_call():
+    model = _Model()
+    rec = CoalescingRecommender(model)
+    queries = iter([("Pizza ", "Delhi"), ("pizza", " delhi")])
+    threads, results, errors = _run_concurrently(2, lambda: rec.recommend_by_preferences(*next(queries), 2, 4.0))
+    _wait_for(lambda: rec.stats()["calls"] == 2)
+    model.release.set()
+    for t in threads:
+        t.join()
+    assert errors == [None, None]
+    assert len(model.calls) == 1
+    # each caller gets its own list
+    assert results[0] == results[1] and results[0] is not results[1]
+
+
+def test_rank_by_is_not_case_folded():
+    model = _Model()
+    model.release.set()
+    rec = CoalescingRecommender(model)
+    assert rec.recommend_by_preferences("pizza", "delhi", 2, 4.0, rank_by="quality")
+    with pytest.raises(ValueError):
+        rec.recommend_by_preferences("pizza", "delhi", 2, 4.0, rank_by="Quality")
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""Visit recording: a restaurant earns points once per user, however often it is recorded."""
+import threading
+
+from database.db import get_user_data, get_user_history, get_user_snapshot, register_user
+from utils.gamification import VISIT_POINTS, record_visit
+
+
+def _points(username):
+    user = get_user_snapshot(username)
+    return user["points"], user["tried_count"]
+
+
+def test_repeat_visit_earns_nothing(temp_db):
+    register_user("asha", "pw")
+    assert record_visit("asha", "Jahanpanah")
+    assert not record_visit("asha", "Jahanpanah")
+    assert _points("asha") == (VISIT_POINTS, 1)
+    assert get_user_history("asha") == {"Jahanpanah"}
+
+
+def test_snapshot_is_updated_in_place(temp_db):
+    register_user("asha", "pw")
+    snapshot = get_user_snapshot("asha")
+    assert record_visit("asha", "Jahanpanah", snapshot)
+    assert snapshot["points"] == VISIT_POINTS and snapshot["tried"] == {"Jahanpanah"}
+    assert not record_visit("asha", "Jahanpanah", snapshot)
+    assert snapshot["points"] == VISIT_POINTS
+
+
+def test_stale_snapshot_defers_to_the_database(temp_db):
+    # two sessions of the same user, each with its own snapshot
+    register_user("asha", "pw")
+    first, second = get_user_snapshot("asha"), get_user_snapshot("asha")
+    assert record_visit("asha", "Jahanpanah", first)
+    assert not record_visit("asha", "Jahanpanah", second)
+    assert "Jahanpanah" in second["tried"]
+    assert _points("asha") == (VISIT_POINTS, 1)
+
+
+def test_concurrent_visits_count_once(temp_db):
+    register_user("asha", "pw")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(record_visit("asha", "Jahanpanah")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == [False] * 7 + [True]
+    assert _points("asha") == (VISIT_POINTS, 1)
+
+
+def test_visits_are_per_user(temp_db):
+    register_user("asha", "pw")
+    register_user("ravi", "pw")
+    assert record_visit("asha", "Jahanpanah")
+    assert record_visit("ravi", "Jahanpanah")
+    assert get_user_data("ravi") is not None
+    assert _points("ravi") == (VISIT_POINTS, 1)
\ No newline at end of file
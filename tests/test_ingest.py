@@ -0,0 +1,69 @@
+"""Dataset ingestion: valid rows reach the Parquet output, bad ones the quarantine file."""
+import pandas as pd
+import pytest
+
+from utils.ingest import REASON_COLUMN, ingest_csv, read_dataset
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def good_row():
+    return pd.read_csv("data/Dataset.csv", dtype=str, keep_default_na=False, nrows=1).iloc[0].to_dict()
+
+
+def _ingest(tmp_path, rows, chunk_size=2):
+    source = tmp_path / "raw.csv"
+    pd.DataFrame(rows).to_csv(source, index=False)
+    out = tmp_path / "clean.parquet"
+    stats = ingest_csv(str(source), str(out), chunk_size=chunk_size, log=lambda msg: None)
+    quarantine = tmp_path / "clean.rejected.csv"
+    rejected = pd.read_csv(quarantine, dtype=str, keep_default_na=False) if quarantine.exists() else None
+    return stats, read_dataset(str(out)), rejected
+
+
+def test_bad_rows_are_quarantined_with_a_reason(tmp_path, good_row):
+    def row(rid, **changes):
+        return dict(good_row, **{"Restaurant ID": str(rid)}, **changes)
+
+    rows = [
+        row(1),
+        row(2, **{"Restaurant Name": " "}),
+        row(3, **{"Latitude": "91"}),
+        row(4, **{"Price range": "7"}),
+        row(5, **{"Votes": "1e30"}),
+        row(6, **{"Aggregate rating": "nan"}),
+        row(7, **{"Votes": "", "Cuisines": ""}),   # optional columns fall back to defaults
+        row(1),                                    # duplicate, in a later chunk
+    ]
+    stats, clean, rejected = _ingest(tmp_path, rows)
+
+    assert (stats["read"], stats["written"], stats["quarantined"]) == (8, 2, 6)
+    assert clean["Restaurant ID"].tolist() == [1, 7]
+    assert clean["Votes"].tolist()[1] == 0
+    assert dict(zip(rejected["Restaurant ID"], rejected[REASON_COLUMN])) == {
+        "2": "missing Restaurant Name",
+        "3": "invalid Latitude",
+        "4": "invalid Price range",
+        "5": "invalid Votes",
+        "6": "invalid Aggregate rating",
+        "1": "duplicate Restaurant ID",
+    }
+    # quarantined rows are kept as they came in
+    assert rejected.loc[rejected["Restaurant ID"] == "3", "Latitude"].item() == "91"
+
+
+def test_clean_file_has_no_quarantine(tmp_path, good_row):
+    stats, clean, rejected = _ingest(tmp_path, [dict(good_row, **{"Restaurant ID": str(i)}) for i in range(5)])
+    assert stats["written"] == 5 and stats["quarantined"] == 0
+    assert rejected is None
+    assert clean["Restaurant ID"].dtype == "int64"
+
+
+def test_missing_column_fails_without_output(tmp_path, good_row):
+    row = dict(good_row)
+    del row["City"]
+    with pytest.raises(ValueError):
+        _ingest(tmp_path, [row])
+    assert not (tmp_path / "clean.parquet").exists()
+    assert not (tmp_path / "clean.parquet.tmp").exists()
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+The preference planner against the original mask-based relaxation
+ladder, incremental add / update / remove against a model rebuilt from
+the same rows, and restaurant id handling on writes.
+
+    python -m pytest -q tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.recommender import FoodRecommender, PREFERENCE_TIERS
+
+DATA_PATH = "data/Dataset.csv"
+
+
+@pytest.fixture(scope="module")
+def model():
+    return FoodRecommender(DATA_PATH)
+
+
+# ---------- Preference planner vs the mask-based ladder ----------
+def _safe_price(x):
+    try:
+        return int(float(x))
+    except Exception:
+        return None
+
+
+def _safe_rating(x):
+    try:
+        return float(x)
+    except Exception:
+        return 0.0
+
+
+def ladder_rows(df, cuisine, city, price, rating):
+    # the original recommend_by_preferences: one pandas mask per tier
+    cuisine_q = cuisine.strip().lower() if cuisine else ""
+    city_q = city.strip().lower() if city else ""
+    city_clean = df["City"].astype(str).str.strip().str.lower()
+    cuisines = df["Cuisines"].astype(str).str.lower()
+    price_clean = df["Price range"].apply(_safe_price).astype(float)
+    rating_clean = df["Aggregate rating"].apply(_safe_rating)
+
+    everything = pd.Series(True, index=df.index)
+    city_mask = city_clean.str.contains(city_q, regex=False, na=False) if city_q else everything
+    cuisine_mask = cuisines.str.contains(cuisine_q, regex=False, na=False) if cuisine_q else everything
+    # a filter that does not parse is skipped, as before
+    price_mask = everything
+    try:
+        price_int = int(price)
+        price_mask = price_clean.between(price_int - 1, price_int + 1) | price_clean.isna()
+    except (TypeError, ValueError):
+        pass
+    rating_mask = everything
+    try:
+        rating_mask = rating_clean >= float(rating)
+    except (TypeError, ValueError):
+        pass
+
+    ladder = [
+        city_mask & cuisine_mask & price_mask & rating_mask,
+        city_mask & cuisine_mask & rating_mask,
+        city_mask & rating_mask,
+        city_mask if city_q else ~everything,
+        everything,
+    ]
+    for tier, mask in enumerate(ladder):
+        if mask.any():
+            return np.flatnonzero(mask.to_numpy()), tier
+
+
+PREFERENCE_QUERIES = [
+    ("north indian", "new delhi", 2, 3.5),
+    ("Italian ", " Gurgaon", 3, 4.0),
+    ("pizza", "delhi", 1, None),
+    ("cafe", "", None, 4.5),
+    ("", "mumbai", 4, None),
+    ("", "", None, None),
+    ("sushi", "agra", 4, 4.9),          # cuisine absent from the city
+    ("", "nowhere", 2, 3.0),            # unknown city
+    ("north indian", "", None, 9.0),    # nothing rated that high
+    ("chinese", "noida", "not a price", "not a rating"),
+]
+
+
+@pytest.mark.parametrize("cuisine, city, price, rating", PREFERENCE_QUERIES)
+def test_plan_matches_mask_ladder(model, cuisine, city, price, rating):
+    expected_rows, expected_tier = ladder_rows(model.df, cuisine, city, price, rating)
+    rows, tier = model.plan_preferences(cuisine, city, price, rating)
+    assert PREFERENCE_TIERS[tier] == PREFERENCE_TIERS[expected_tier]
+    np.testing.assert_array_equal(np.sort(rows), expected_rows)
+
+
+@pytest.mark.parametrize("cuisine, city, price, rating", PREFERENCE_QUERIES)
+def test_preference_results_follow_plan(model, cuisine, city, price, rating):
+    rows, _ = model.plan_preferences(cuisine, city, price, rating)
+    allowed = set(model.df["Restaurant Name"].iloc[rows].str.strip().str.title())
+    results = model.recommend_by_preferences(cuisine, city, price, rating, top_n=10)
+    assert results
+    assert {r[0] for r in results} <= allowed
+    scores = [r[3] for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+# ---------- Diversified recommendations ----------
+@pytest.mark.parametrize("diversity", [-0.1, 1, 1.5, float("nan")])
+def test_diversity_outside_unit_interval_is_rejected(model, diversity):
+    with pytest.raises(ValueError):
+        model.recommend("domino's pizza", "new delhi", diversity=diversity)
+
+
+def test_diversity_reranks_the_same_candidates(model):
+    plain = model.recommend("domino's pizza", "new delhi", top_n=10)
+    assert model.recommend("domino's pizza", "new delhi", top_n=10, diversity=0.0) == plain
+    varied = model.recommend("domino's pizza", "new delhi", top_n=10, diversity=0.7)
+    assert len(varied) == len(plain)
+    # the most relevant restaurant is always picked first
+    assert varied[0] == plain[0]
+    assert len({r[0] for r in varied}) == len(varied)
+
+
+# ---------- Incremental updates vs a full rebuild ----------
+def _neighbors_by_id(ids, idx, sims):
+    # (score, restaurant id) pairs of one neighbour list; the group tied at
+    # the cut-off depends on row order, so it is left out
+    keep = idx >= 0
+    idx, sims = idx[keep], sims[keep]
+    cut = sims[-1] if len(sims) else None
+    return sims, sorted((round(float(s), 5), int(ids[i])) for i, s in zip(idx, sims) if s != cut)
+
+
+@pytest.fixture(scope="module")
+def updated(tmp_path_factory):
+    """An incrementally updated model and a model rebuilt from the same rows."""
+    full = pd.read_csv(DATA_PATH)
+    held = full.sample(40, random_state=1)
+    tmp = tmp_path_factory.mktemp("incremental")
+    full.drop(held.index).to_csv(tmp / "start.csv", index=False)
+
+    model = FoodRecommender(str(tmp / "start.csv"))
+    model.add_restaurants(held.to_dict("records"))
+    renamed, edited, removed = (int(full["Restaurant ID"].iloc[i]) for i in (5, 20, 10))
+    model.update_restaurant(renamed, {"Restaurant Name": "Renamed Pizza Place", "Cuisines": "Pizza, Italian"})
+    model.update_restaurant(edited, {"Aggregate rating": 4.9, "Votes": 999})
+    model.update_restaurant(edited, {"Average Cost for two": 12345})
+    assert model.remove_restaurant(removed)
+    assert not model.remove_restaurant(removed)
+
+    expected = full.copy()
+    expected.loc[expected["Restaurant ID"] == renamed, ["Restaurant Name", "Cuisines"]] = ["Renamed Pizza Place", "Pizza, Italian"]
+    expected.loc[expected["Restaurant ID"] == edited, ["Aggregate rating", "Votes", "Average Cost for two"]] = [4.9, 999, 12345]
+    expected = expected[expected["Restaurant ID"] != removed]
+    expected.to_csv(tmp / "expected.csv", index=False)
+    return model, FoodRecommender(str(tmp / "expected.csv"))
+
+
+def test_incremental_keeps_the_same_restaurants(updated):
+    model, rebuilt = updated
+    live = model.df.loc[model.state.active, "Restaurant ID"]
+    assert sorted(live) == sorted(rebuilt.df["Restaurant ID"])
+
+
+def test_incremental_neighbors_match_rebuild(updated):
+    model, rebuilt = updated
+    ids, idx, sim = model.df["Restaurant ID"].to_numpy(), model.neighbor_idx, model.neighbor_sim
+    ref_ids, ref_idx, ref_sim = rebuilt.df["Restaurant ID"].to_numpy(), rebuilt.neighbor_idx, rebuilt.neighbor_sim
+    ref_rows = dict(zip(ref_ids, range(len(ref_ids))))
+    for row in np.flatnonzero(model.state.active):
+        ref = ref_rows[ids[row]]
+        scores, pairs = _neighbors_by_id(ids, idx[row], sim[row])
+        ref_scores, ref_pairs = _neighbors_by_id(ref_ids, ref_idx[ref], ref_sim[ref])
+        np.testing.assert_allclose(scores, ref_scores, atol=1e-6)
+        assert pairs == ref_pairs
+
+
+@pytest.mark.parametrize("name, city", [("renamed pizza place", "new delhi"), ("domino's pizza", "new delhi"), ("barbeque nation", "gurgaon")])
+def test_incremental_recommend_matches_rebuild(updated, name, city):
+    model, rebuilt = updated
+    assert [r[:4] for r in model.recommend(name, city)] == [r[:4] for r in rebuilt.recommend(name, city)]
+
+
+@pytest.mark.parametrize("cuisine, city, price, rating", PREFERENCE_QUERIES)
+def test_incremental_plan_matches_rebuild(updated, cuisine, city, price, rating):
+    # exercises the sorted price / rating / cost indexes patched in place
+    model, rebuilt = updated
+    for kwargs in ({}, {"min_cost": 300, "max_cost": 900}, {"min_cost": 10000}):
+        rows, tier = model.plan_preferences(cuisine, city, price, rating, **kwargs)
+        ref_rows, ref_tier = rebuilt.plan_preferences(cuisine, city, price, rating, **kwargs)
+        assert tier == ref_tier
+        assert sorted(model.df["Restaurant ID"].iloc[rows]) == sorted(rebuilt.df["Restaurant ID"].iloc[ref_rows])
+
+
+@pytest.mark.parametrize("cuisine, city, price, rating", PREFERENCE_QUERIES[:6])
+def test_incremental_preferences_match_rebuild(updated, cuisine, city, price, rating):
+    model, rebuilt = updated
+    got = model.recommend_by_preferences(cuisine, city, price, rating)
+    want = rebuilt.recommend_by_preferences(cuisine, city, price, rating)
+    assert [r[:4] for r in got] == [r[:4] for r in want]
+
+
+def test_incremental_quality_matches_recompute(updated):
+    # city priors are fixed at build time, so compare against a full
+    # recompute with the model's own priors rather than a rebuild
+    model, _ = updated
+    np.testing.assert_allclose(model.state.quality, model._quality(model.df))
+
+
+# ---------- Restaurant ids on write ----------
+@pytest.fixture
+def small_model(tmp_path):
+    pd.read_csv(DATA_PATH).head(300).to_csv(tmp_path / "small.csv", index=False)
+    return FoodRecommender(str(tmp_path / "small.csv"))
+
+
+def _row(model, restaurant_id):
+    return dict(model.df.iloc[0][model.source_columns].to_dict(), **{"Restaurant ID": restaurant_id})
+
+
+def test_add_rejects_ids_repeated_in_one_batch(small_model):
+    before = len(small_model.df)
+    with pytest.raises(ValueError):
+        small_model.add_restaurants([_row(small_model, 999001), _row(small_model, 999001)])
+    assert len(small_model.df) == before
+    assert not small_model.remove_restaurant(999001)
+
+
+def test_ids_are_matched_across_types(small_model):
+    existing = int(small_model.df["Restaurant ID"].iloc[0])
+    with pytest.raises(ValueError):
+        small_model.add_restaurants([_row(small_model, str(existing))])
+
+    small_model.add_restaurants([_row(small_model, " 999002 ")])
+    assert small_model.df["Restaurant ID"].dtype == np.int64
+    assert small_model.update_restaurant("999002", {"Votes": 5}) is not None
+    assert small_model.remove_restaurant(999002)
+    assert not small_model.remove_restaurant("999002")
+    assert not small_model.remove_restaurant("not an id")
\ No newline at end of file
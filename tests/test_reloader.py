@@ -0,0 +1,75 @@
+"""ReloadingRecommender: swap in a model built from the changed dataset, keep serving on failure."""
+import pytest
+
+from utils.reloader import ReloadingRecommender
+
+
+class _Model:
+    def __init__(self, text):
+        self.text = text
+
+    def recommend(self):
+        return self.text
+
+
+def _reloader(path, factory):
+    reloader = ReloadingRecommender(str(path), factory, poll_interval=0.01, log=lambda msg: None)
+    reloader.stop()   # tests drive check() themselves
+    reloader._thread.join()
+    return reloader
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("v1")
+    return path
+
+
+def test_unchanged_file_is_not_reloaded(dataset):
+    builds = []
+    reloader = _reloader(dataset, lambda p: builds.append(p) or _Model("v1"))
+    assert not reloader.check()
+    assert len(builds) == 1 and reloader.version == 1
+
+
+def test_changed_file_is_swapped_in(dataset):
+    reloader = _reloader(dataset, lambda p: _Model(open(p).read()))
+    old = reloader.current
+    dataset.write_text("version two")
+
+    assert reloader.check()
+    assert reloader.version == 2
+    assert reloader.current is not old
+    # attribute access resolves against the current model
+    assert reloader.recommend() == "version two"
+    # a call holding the old model keeps it
+    assert old.recommend() == "v1"
+
+
+def test_failed_rebuild_keeps_serving(dataset):
+    def factory(path):
+        text = open(path).read()
+        if text == "broken":
+            raise ValueError("bad dataset")
+        return _Model(text)
+
+    reloader = _reloader(dataset, factory)
+    dataset.write_text("broken")
+    assert not reloader.check()
+    assert reloader.recommend() == "v1"
+    assert reloader.status()["last_error"] == "ValueError: bad dataset"
+    # the broken version is not retried on every poll
+    assert not reloader.check()
+
+    dataset.write_text("fixed again")
+    assert reloader.check()
+    assert reloader.recommend() == "fixed again"
+    assert reloader.status()["last_error"] is None
+
+
+def test_missing_file_keeps_serving(dataset):
+    reloader = _reloader(dataset, lambda p: _Model("v1"))
+    dataset.unlink()
+    assert not reloader.check()
+    assert reloader.recommend() == "v1"
\ No newline at end of file
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from utils.ingest import read_dataset
+
+# Filterable fields -> dataset column
+FILTER_COLUMNS = {
+    "name": "Restaurant Name",
+    "city": "City",
+    "cuisine": "Cuisines",
+}
+# Sort keys -> dataset column (always descending, ties in dataset order)
+SORT_COLUMNS = {
+    "rating": "Aggregate rating",
+    "votes": "Votes",
+}
+DISPLAY_COLUMNS = ["Restaurant Name", "City", "Address", "Cuisines", "Aggregate rating", "Votes"]
+
+
+class ResultSet:
+    """Rows (dataset positions) matching one set of filters, plus cached sort orders."""
+
+    __slots__ = ('explorer', 'filters', 'rows', 'sorted')
+
+    def __init__(self, explorer, filters, rows):
+        self.explorer = explorer
+        self.filters = filters
+        self.rows = rows
+        self.sorted = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class DatasetExplorer:
+    """
+    Query engine behind the Dataset page: case-insensitive substring
+    filters, sorting by rating or votes, and offset/limit pages with the
+    total count. Lowercased text columns and sort ranks are built once.
+
+    Narrowing is incremental: if every filter text contains the previous
+    text for that field, the new matches are a subset of the previous
+    ones, so only the previous rows are scanned.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.text = {
+            field: df[col].astype(str).str.lower().to_numpy(dtype=object)
+            for field, col in FILTER_COLUMNS.items()
+        }
+        # rank[row] = position of the row in descending key order
+        self.rank = {}
+        for key, col in SORT_COLUMNS.items():
+            values = pd.to_numeric(df[col], errors='coerce').fillna(-np.inf).to_numpy()
+            order = np.argsort(-values, kind='stable')
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self.rank[key] = rank
+        self.scanned = 0   # rows examined by filters (for diagnostics)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(read_dataset(path).fillna("N/A"))
+
+    def query(self, filters, previous=None):
+        """
+        filters: {field: text}; empty texts are ignored. `previous` is the
+        ResultSet of the last query, reused when the new one only narrows it.
+        """
+        filters = {f: t.strip().lower() for f, t in filters.items() if t and t.strip()}
+        if previous is not None and previous.explorer is not self:
+            previous = None   # from before a dataset reload
+
+        if previous is not None and previous.filters == filters:
+            return previous
+        narrowing = previous is not None and set(previous.filters) <= set(filters) and all(
+            old in filters[f] for f, old in previous.filters.items()
+        )
+        rows = previous.rows if narrowing else np.arange(len(self.df))
+
+        for field, needle in filters.items():
+            if narrowing and previous.filters.get(field) == needle:
+                continue   # every previous row already matches this one
+            values = self.text[field][rows]
+            self.scanned += len(values)
+            rows = rows[np.fromiter((needle in v for v in values), dtype=bool, count=len(values))]
+        return ResultSet(self, filters, rows)
+
+    def from_rows(self, rows, label):
+        """
+        Wrap externally found row ids (e.g. full-text search hits, best
+        first) as a ResultSet; "Dataset order" then keeps their order.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return ResultSet(self, {"search": label}, rows[(rows >= 0) & (rows < len(self.df))])
+
+    def page(self, result, sort=None, offset=0, limit=100):
+        """Returns (DataFrame slice, total matching rows)."""
+        rows = result.rows
+        if sort:
+            if sort not in result.sorted:
+                result.sorted[sort] = rows[np.argsort(self.rank[sort][rows], kind='stable')]
+            rows = result.sorted[sort]
+        chunk = rows[offset:offset + limit]
+        return self.df.iloc[chunk][DISPLAY_COLUMNS], len(result)
+
+    def frame(self, result):
+        # every matching row, e.g. for the map
+        return self.df.iloc[result.rows]
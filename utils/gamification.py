@@ -1,9 +1,15 @@
+import datetime
+
 from database.db import (
     init_db, register_user, validate_user, reset_password,
     add_points, get_user_data, get_leaderboard,
-    add_user_badge, get_user_badges
+    add_user_badge, get_user_badges,
+    add_user_history
 )
 
+# Points for trying a restaurant for the first time
+VISIT_POINTS = 5
+
 # ---- BADGE ASSIGNMENT (current live badge) ----
 def assign_badge(points):
     if points >= 220:
@@ -36,7 +42,7 @@ def check_and_award_badge(username):
     """
     user = get_user_data(username)
     if not user:
-        return
+        return []
 
     points = user[2]  # points column
 
@@ -58,6 +64,39 @@ def check_and_award_badge(username):
     existing_badges = [b[0] for b in get_user_badges(username)]
 
     # Award missing badges the user qualifies for
+    awarded = []
     for threshold, badge_name in badge_levels:
         if points >= threshold and badge_name not in existing_badges:
-            add_user_badge(username, badge_name, points)
\ No newline at end of file
+            add_user_badge(username, badge_name, points)
+            awarded.append((badge_name, points))
+    return awarded
+
+
+# ---- VISIT RECORDING ----
+def record_visit(username, restaurant_name, snapshot=None):
+    """
+    Records that a user tried a restaurant. Only the first visit earns
+    points (and possibly badges). Returns True when it was a new visit.
+
+    With a session snapshot (get_user_snapshot) a repeat is caught by a
+    set lookup, and the snapshot is updated in place. The database has the
+    final say: the history insert is unique per (user, restaurant), so a
+    visit already recorded by another session or the API earns nothing.
+    """
+    if snapshot is not None and restaurant_name in snapshot["tried"]:
+        return False
+
+    if not add_user_history(username, restaurant_name):
+        if snapshot is not None:
+            snapshot["tried"].add(restaurant_name)
+        return False
+    awarded = add_points(username, VISIT_POINTS)
+
+    if snapshot is not None:
+        snapshot["points"] += VISIT_POINTS
+        snapshot["tried_count"] += 1
+        snapshot["tried"].add(restaurant_name)
+        # same format and UTC clock as the earned_on column default
+        now = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        snapshot["badges"] = [(name, now, score) for name, score in reversed(awarded)] + snapshot["badges"]
+    return True
\ No newline at end of file
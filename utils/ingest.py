@@ -0,0 +1,174 @@
+import os
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Rows per chunk; peak memory is a few chunks' worth whatever the file size
+CHUNK_SIZE = 50_000
+
+# Column -> (kind, required, valid range, default when empty)
+# Required columns reject the row when empty; others fall back to the default.
+SCHEMA = {
+    "Restaurant ID": ("int", True, None, None),
+    "Restaurant Name": ("text", True, None, None),
+    "Country Code": ("int", False, (0, None), 0),
+    "City": ("text", True, None, None),
+    "Address": ("text", False, None, ""),
+    "Locality": ("text", False, None, ""),
+    "Locality Verbose": ("text", False, None, ""),
+    "Longitude": ("float", True, (-180, 180), None),
+    "Latitude": ("float", True, (-90, 90), None),
+    "Cuisines": ("text", False, None, ""),
+    "Average Cost for two": ("int", False, (0, None), 0),
+    "Currency": ("text", False, None, ""),
+    "Has Table booking": ("text", False, None, "No"),
+    "Has Online delivery": ("text", False, None, "No"),
+    "Is delivering now": ("text", False, None, "No"),
+    "Switch to order menu": ("text", False, None, "No"),
+    "Price range": ("int", True, (1, 4), None),
+    "Aggregate rating": ("float", False, (0, 5), 0.0),
+    "Rating color": ("text", False, None, ""),
+    "Rating text": ("text", False, None, ""),
+    "Votes": ("int", False, (0, None), 0),
+}
+
+REASON_COLUMN = "Reject Reason"
+
+
+def read_dataset(path):
+    """Load the dataset from CSV or from ingest_csv()'s Parquet output."""
+    if str(path).lower().endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def dataset_signature(path):
+    """Identifies one version of a dataset file (path, mtime, size)."""
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}"
+
+
+def arrow_schema():
+    import pyarrow as pa
+    types = {"int": pa.int64(), "float": pa.float64(), "text": pa.string()}
+    return pa.schema([(col, types[kind]) for col, (kind, *_) in SCHEMA.items()])
+
+
+# ---------- VALIDATION ----------
+def validate_chunk(raw, seen_ids):
+    """
+    raw: a chunk read as strings. Returns (clean typed frame, rejected raw
+    rows with a reason column). A row's reason names the first failing
+    column, or a duplicate Restaurant ID (first occurrence wins, also
+    across chunks via `seen_ids`).
+    """
+    clean = {}
+    reason = np.full(len(raw), "", dtype=object)
+
+    for col, (kind, required, bounds, default) in SCHEMA.items():
+        text = raw[col].str.strip()
+        empty = (text == "").to_numpy()
+        if kind == "text":
+            bad = empty if required else np.zeros(len(raw), dtype=bool)
+            values = text.where(~empty, default) if default is not None else text
+        else:
+            values = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+            if default is not None:
+                values[empty] = default
+            bad = ~np.isfinite(values)
+            if kind == "int":
+                # whole numbers that fit int64 ("1e30" would wrap on the cast)
+                bad |= (values != np.trunc(values)) | (values < -2.0 ** 63) | (values >= 2.0 ** 63)
+            if bounds is not None:
+                low, high = bounds
+                with np.errstate(invalid="ignore"):
+                    if low is not None:
+                        bad |= values < low
+                    if high is not None:
+                        bad |= values > high
+            values = np.where(bad, 0, values).astype(np.int64 if kind == "int" else float)
+        first = bad & (reason == "")
+        reason[first & empty] = f"missing {col}"
+        reason[first & ~empty] = f"invalid {col}"
+        clean[col] = values
+
+    ids = clean["Restaurant ID"]
+    ok = reason == ""
+    dup = np.zeros(len(raw), dtype=bool)
+    for i in np.flatnonzero(ok):
+        rid = int(ids[i])
+        if rid in seen_ids:
+            dup[i] = True
+        else:
+            seen_ids.add(rid)
+    reason[dup] = "duplicate Restaurant ID"
+    ok &= ~dup
+
+    clean = pd.DataFrame(clean, index=raw.index)[ok]
+    rejected = raw[~ok].assign(**{REASON_COLUMN: reason[~ok]})
+    return clean, rejected
+
+
+# ---------- PIPELINE ----------
+def ingest_csv(source, out_path, quarantine_path=None, chunk_size=CHUNK_SIZE, log=print):
+    """
+    Stream `source` CSV into a typed Parquet file, one row group per
+    chunk. Rejected rows go, unmodified, to `quarantine_path` (CSV with a
+    reason column). The output is written next to its final name and
+    swapped in at the end, so a failed run never leaves half a dataset.
+    Returns counts: rows read / written / quarantined and reasons.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    start = time.perf_counter()
+    quarantine_path = quarantine_path or os.path.splitext(out_path)[0] + ".rejected.csv"
+    schema = arrow_schema()
+    stats = {"chunks": 0, "read": 0, "written": 0, "quarantined": 0, "reasons": Counter()}
+    seen_ids = set()
+    if os.path.exists(quarantine_path):
+        os.remove(quarantine_path)   # from an earlier run
+
+    reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    tmp_path = out_path + ".tmp"
+    writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+    quarantine_header = True
+    try:
+        for raw in reader:
+            missing = [col for col in SCHEMA if col not in raw.columns]
+            if missing:
+                raise ValueError(f"{source} is missing columns: {missing}")
+            if stats["chunks"] == 0:
+                extra = [col for col in raw.columns if col not in SCHEMA]
+                if extra:
+                    log(f"Ignoring columns not in the schema: {extra}")
+
+            clean, rejected = validate_chunk(raw, seen_ids)
+            writer.write_table(pa.Table.from_pandas(clean, schema=schema, preserve_index=False))
+            if len(rejected):
+                rejected.to_csv(quarantine_path, mode="w" if quarantine_header else "a",
+                                header=quarantine_header, index=False)
+                quarantine_header = False
+
+            stats["chunks"] += 1
+            stats["read"] += len(raw)
+            stats["written"] += len(clean)
+            stats["quarantined"] += len(rejected)
+            stats["reasons"].update(rejected[REASON_COLUMN])
+            log(f"  chunk {stats['chunks']}: {stats['read']} rows read, {stats['quarantined']} quarantined")
+        writer.close()
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, out_path)
+
+    stats["seconds"] = time.perf_counter() - start
+    log(f"Ingested {stats['written']} of {stats['read']} rows into {out_path} in {stats['seconds']:.1f}s")
+    if stats["quarantined"]:
+        log(f"Quarantined {stats['quarantined']} rows in {quarantine_path}:")
+        for why, n in stats["reasons"].most_common():
+            log(f"  {n:>8}  {why}")
+    return stats
@@ -1,7 +1,18 @@
+import numpy as np
 import pandas as pd
 import pydeck as pdk
 import streamlit as st
 
+# Only these columns are shipped to the browser for the dataset map
+MAP_COLUMNS = ["Restaurant Name", "Cuisines", "City", "Aggregate rating", "Latitude", "Longitude"]
+# Above this many points the dataset map switches to grid clusters
+MAX_MAP_POINTS = 1500
+
+SELECTED_COLOR = [255, 255, 0]
+POINT_COLOR = [255, 50, 50]
+POINT_COLOR_DARK = [255, 100, 100]
+CLUSTER_COLOR = [255, 140, 0]
+
 def build_map(recommendations, selected_restaurant, theme):
     if not recommendations:
         return None
@@ -21,13 +32,10 @@ def build_map(recommendations, selected_restaurant, theme):
     selected_clean = selected_restaurant.strip().lower() if selected_restaurant else None
     map_df["is_selected"] = map_df["Restaurant Name Clean"] == selected_clean
 
-    # Colors
-    def get_color(row):
-        if row["is_selected"]:
-            return [255, 255, 0]   # Yellow
-        return [255, 50, 50]      # Red
-
-    map_df["color"] = map_df.apply(get_color, axis=1)
+    # Colors (yellow = selected, red = rest)
+    map_df["color"] = np.where(
+        map_df["is_selected"].to_numpy()[:, None], SELECTED_COLOR, POINT_COLOR
+    ).tolist()
 
     # Center map
     if selected_clean in map_df["Restaurant Name Clean"].values:
@@ -77,4 +85,115 @@ def render_map_section():
     if chart:
         st.pydeck_chart(chart)
     else:
-        st.info("No restaurants to display on the map.")
\ No newline at end of file
+        st.info("No restaurants to display on the map.")
+
+
+# ---------- DATASET MAP (large layers) ----------
+def _cell_size(zoom):
+    # roughly 1/16th of a map tile at this zoom level, in degrees
+    return 360.0 / (2 ** zoom) / 16
+
+
+def prepare_map_data(df, zoom=10, max_points=MAX_MAP_POINTS):
+    """
+    Slim a (possibly huge) restaurant frame down to a bounded map payload.
+    Keeps only MAP_COLUMNS and, above max_points, merges points into
+    zoom-level grid cells (coarsening the grid until it fits).
+    """
+    map_df = df[[c for c in MAP_COLUMNS if c in df.columns]].copy()
+    map_df["Latitude"] = pd.to_numeric(map_df["Latitude"], errors="coerce")
+    map_df["Longitude"] = pd.to_numeric(map_df["Longitude"], errors="coerce")
+    map_df = map_df.dropna(subset=["Latitude", "Longitude"])
+    map_df = map_df.drop_duplicates(subset=["Restaurant Name", "City"])
+
+    if len(map_df) <= max_points:
+        map_df["count"] = 1
+        return map_df.reset_index(drop=True)
+
+    if "Aggregate rating" in map_df.columns:
+        map_df["Aggregate rating"] = pd.to_numeric(map_df["Aggregate rating"], errors="coerce")
+
+    lat = map_df["Latitude"].to_numpy()
+    lon = map_df["Longitude"].to_numpy()
+    cell = _cell_size(zoom)
+    while True:
+        lat_bin = np.floor(lat / cell).astype(np.int64)
+        lon_bin = np.floor(lon / cell).astype(np.int64)
+        # unique cells via a single combined key
+        _, cell_ids = np.unique(np.stack([lat_bin, lon_bin], axis=1), axis=0, return_inverse=True)
+        cell_ids = cell_ids.ravel()
+        if cell_ids.max() + 1 <= max_points:
+            break
+        cell *= 2
+
+    agg = {"Latitude": "mean", "Longitude": "mean", "Restaurant Name": "first", "City": "first"}
+    if "Cuisines" in map_df.columns:
+        agg["Cuisines"] = "first"
+    if "Aggregate rating" in map_df.columns:
+        agg["Aggregate rating"] = "mean"
+    grouped = map_df.groupby(cell_ids, sort=False)
+    clusters = grouped.agg(agg)
+    clusters["count"] = grouped.size()
+
+    multi = clusters["count"] > 1
+    clusters.loc[multi, "Restaurant Name"] = clusters.loc[multi, "count"].astype(str) + " restaurants"
+    if "Cuisines" in clusters.columns:
+        clusters.loc[multi, "Cuisines"] = "e.g. " + clusters.loc[multi, "Cuisines"].astype(str)
+    if "Aggregate rating" in clusters.columns:
+        clusters["Aggregate rating"] = clusters["Aggregate rating"].round(1)
+    return clusters.reset_index(drop=True)
+
+
+def build_dataset_map(df, theme="light", zoom=10, max_points=MAX_MAP_POINTS):
+    map_df = prepare_map_data(df, zoom=zoom, max_points=max_points)
+    if map_df.empty:
+        return None
+
+    is_dark = theme == "dark"
+    counts = map_df["count"].to_numpy()
+    map_df["color"] = np.where(
+        (counts > 1)[:, None], CLUSTER_COLOR, POINT_COLOR_DARK if is_dark else POINT_COLOR
+    ).tolist()
+    # clusters grow with the number of restaurants they hold
+    map_df["radius"] = 80 * np.sqrt(counts)
+
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=map_df,
+        get_position='[Longitude, Latitude]',
+        get_fill_color='color',
+        get_radius='radius',
+        radius_scale=10,
+        radius_min_pixels=4,
+        radius_max_pixels=30,
+        stroked=True,
+        filled=True,
+        line_width_min_pixels=1,
+        get_line_color=[0, 0, 0, 100],
+        opacity=0.45,
+        pickable=True
+    )
+
+    view_state = pdk.ViewState(
+        latitude=map_df["Latitude"].mean(),
+        longitude=map_df["Longitude"].mean(),
+        zoom=zoom,
+        pitch=0
+    )
+
+    tooltip = {
+        "html": "<b>🍽️ {Restaurant Name}</b><br/>{Cuisines}<br/>⭐ {Aggregate rating}<br/>🏙️ {City}",
+        "style": {
+            "backgroundColor": "rgba(30,30,30,0.85)" if is_dark else "rgba(255,255,255,0.9)",
+            "color": "#fff" if is_dark else "#000",
+            "borderRadius": "6px",
+            "padding": "6px"
+        }
+    }
+
+    return pdk.Deck(
+        layers=[layer],
+        initial_view_state=view_state,
+        tooltip=tooltip,
+        map_style=None
+    )
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from utils.ingest import dataset_signature
+
+# Seconds between dataset checks
+POLL_INTERVAL = 30
+
+
+class ReloadingRecommender:
+    """
+    Serves from the current model while a daemon thread watches the
+    dataset file. When it changes (and has stopped changing), a new model
+    is built off the serving path and swapped in with one reference
+    assignment. Calls already running keep the model they started on; a
+    failed rebuild keeps serving the old one.
+
+    Incremental writes (add_restaurants, ...) live in the current model
+    only and are replaced by the next reload.
+    """
+
+    def __init__(self, data_path, factory, poll_interval=POLL_INTERVAL, log=print):
+        self.data_path = data_path
+        self.factory = factory
+        self.poll_interval = poll_interval
+        self.log = log
+
+        self.signature = self._signature()
+        self.current = factory(data_path)
+        self.version = 1
+        self.loaded_at = time.time()
+        self.last_error = None
+
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="dataset-reloader", daemon=True)
+        self._thread.start()
+
+    def _signature(self):
+        # the same signature the model and the search index record; None while missing
+        try:
+            return dataset_signature(self.data_path)
+        except FileNotFoundError:
+            return None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def check(self):
+        """Reload if the dataset changed since the last build. Returns True on swap."""
+        # one rebuild at a time; a concurrent caller just skips
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._reload()
+        finally:
+            self._reload_lock.release()
+
+    def _reload(self):
+        seen = self._signature()
+        if seen is None or seen == self.signature:
+            return False
+
+        # wait for the writer to finish: the file must hold still for a moment
+        time.sleep(min(self.poll_interval, 1.0))
+        if self._signature() != seen:
+            return False
+
+        start = time.perf_counter()
+        try:
+            model = self.factory(self.data_path)
+        except Exception as e:
+            # remember the broken signature so it isn't retried every poll
+            self.signature = seen
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.log(f"Dataset reload failed, still serving v{self.version}: {self.last_error}")
+            return False
+
+        self.current = model   # atomic swap
+        self.signature = seen
+        self.version += 1
+        self.loaded_at = time.time()
+        self.last_error = None
+        self.log(f"Dataset reloaded as v{self.version} in {time.perf_counter() - start:.1f}s")
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "last_error": self.last_error,
+        }
+
+    def __getattr__(self, name):
+        # resolved against whichever model is current at call time
+        return getattr(self.current, name)
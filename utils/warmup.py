@@ -0,0 +1,55 @@
+import threading
+import time
+
+# Reference point for the cold-start log lines (first import = app start)
+PROCESS_START = time.perf_counter()
+
+
+class WarmUp:
+    """
+    Runs named stages in order on a daemon thread. Each stage has its
+    own readiness Event, so a page that needs only pandas does not wait
+    for the model build. wait(stage) blocks until that stage is done and
+    returns its value, or re-raises its error.
+    """
+
+    def __init__(self, stages, log=print):
+        self.stages = list(stages)
+        self.log = log
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.events = {name: threading.Event() for name, _ in self.stages}
+        self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+
+    def start(self):
+        self.log(f"[warm-up] starting at t+{time.perf_counter() - PROCESS_START:.2f}s")
+        self._thread.start()
+        return self
+
+    def _run(self):
+        begin = time.perf_counter()
+        for name, fn in self.stages:
+            start = time.perf_counter()
+            try:
+                self.results[name] = fn()
+            except Exception as e:
+                self.errors[name] = e
+                self.log(f"[warm-up] {name} failed: {type(e).__name__}: {e}")
+            self.timings[name] = time.perf_counter() - start
+            self.events[name].set()
+            self.log(
+                f"[warm-up] {name}: {self.timings[name]:.2f}s "
+                f"(t+{time.perf_counter() - PROCESS_START:.2f}s since start)"
+            )
+        self.log(f"[warm-up] all stages done in {time.perf_counter() - begin:.2f}s")
+
+    def is_ready(self, stage):
+        return self.events[stage].is_set()
+
+    def wait(self, stage, timeout=None):
+        if not self.events[stage].wait(timeout):
+            raise TimeoutError(f"warm-up stage '{stage}' not ready after {timeout}s")
+        if stage in self.errors:
+            raise self.errors[stage]
+        return self.results[stage]